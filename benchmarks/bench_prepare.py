@@ -0,0 +1,109 @@
+# benchmarks/bench_prepare.py
+# Compares the vectorized prepare_dataframe against the previous per-row
+# apply() implementation on synthetic uploads.
+#
+#   python benchmarks/bench_prepare.py                 # 10k, 100k, 1M rows
+#   python benchmarks/bench_prepare.py --sizes 10000 50000
+
+import argparse, os, sys, time
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from sales_dashboard.ingest import prepare_dataframe  # noqa: E402
+
+
+# -------------------- Previous implementation (reference) --------------------
+def _age_group(age):
+    try:
+        a = float(age)
+    except Exception:
+        return "Unknown"
+    if a <= 18: return "Teen"
+    if a <= 25: return "Youth"
+    if a <= 40: return "Adult"
+    if a <= 60: return "Middle"
+    return "Senior"
+
+def _month_short(val):
+    try:
+        return pd.to_datetime(val).strftime("%b")
+    except Exception:
+        return ""
+
+def legacy_prepare(df):
+    cost_col = "Purchase Amount"
+    df["Selling Price"] = pd.to_numeric(df.get("Selling Price", 0), errors="coerce").fillna(0)
+    df[cost_col] = pd.to_numeric(df.get(cost_col, 0), errors="coerce").fillna(0)
+    df["__Profit"] = df["Selling Price"] - df[cost_col]
+    df["__Age Group"] = df["Age"].apply(_age_group)
+    df["__Month"] = df["Purchase Date"].apply(_month_short)
+    keep = ["Customer Name","Age","Country","Product","Purchase Date",cost_col,"Payment Mode","Category","Selling Price","__Profit","__Age Group","__Month"]
+    out = df[keep].copy()
+    out["Purchase Date"] = pd.to_datetime(out["Purchase Date"], errors="coerce").dt.date.astype(str)
+    return out, cost_col
+
+
+# -------------------- Synthetic data --------------------
+def make_frame(n, seed=0):
+    rng = np.random.default_rng(seed)
+    cost = rng.integers(100, 50000, n).astype(float)
+    return pd.DataFrame({
+        "Customer Name": np.char.add("Customer ", rng.integers(0, max(n // 3, 1), n).astype(str)),
+        "Age": rng.integers(14, 75, n),
+        "Country": rng.choice(["India", "USA", "UK", "Germany", "Japan", "Brazil"], n),
+        "Product": rng.choice(["Smartphone", "Laptop", "Headphones", "Shirt", "Shoes", "Lamp"], n),
+        "Purchase Date": pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 730, n), unit="D"),
+        "Purchase Amount": cost,
+        "Payment Mode": rng.choice(["UPI", "Card", "Cash"], n),
+        "Category": rng.choice(["Electronics", "Fashion", "Home"], n),
+        "Selling Price": (cost * rng.uniform(0.8, 1.5, n)).round(),
+    })
+
+
+def with_irregular_dates(df, seed=0):
+    """`df` with some dates written in other formats and some left blank, as hand-kept workbooks have."""
+    rng = np.random.default_rng(seed)
+    dates = pd.to_datetime(df["Purchase Date"])
+    text = dates.dt.strftime("%Y-%m-%d").to_numpy(dtype=object)
+    pick = rng.integers(0, 10, len(df))
+    text[pick == 0] = dates[pick == 0].dt.strftime("%m/%d/%Y")
+    text[pick == 1] = dates[pick == 1].dt.strftime("%B %d %Y")
+    text[pick == 2] = ""
+    text[pick == 3] = None
+    return df.assign(**{"Purchase Date": text})
+
+
+def _same(old, new):
+    """Column-by-column equality. The previous Purchase Date parse was column-wide
+    (dates in other formats became "NaT"), so there it only has to agree where it parsed."""
+    for c in old.columns:
+        a, b = old[c].astype(str), new[c].astype(str)
+        if c == "Purchase Date":
+            a, b = a[a != "NaT"], b[a != "NaT"]
+        if not a.equals(b):
+            return False
+    return True
+
+
+def _time(fn, df):
+    start = time.perf_counter()
+    out, _ = fn(df.copy())
+    return time.perf_counter() - start, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark prepare_dataframe against the per-row implementation.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>10} {'dates':>9} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}  same")
+    for n in args.sizes:
+        for label, df in (("iso", make_frame(n)), ("irregular", with_irregular_dates(make_frame(n)))):
+            t_old, old = _time(legacy_prepare, df)
+            t_new, new = _time(prepare_dataframe, df)
+            print(f"{n:>10,} {label:>9} {t_old:>12.3f} {t_new:>15.3f} {t_old / t_new:>8.1f}x  {_same(old, new)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,41 @@
+# benchmarks/bench_report.py
+# PDF report latency and file size with Kaleido PNG charts versus reportlab
+# vector charts, on a synthetic upload. The chart PNG cache is disabled so every
+# Kaleido run really rasterizes.
+#
+#   python benchmarks/bench_report.py                  # 100k rows, 3 runs each
+#   python benchmarks/bench_report.py --rows 1000000 --runs 5
+
+import argparse, os, statistics, sys, time
+
+os.environ["CHART_CACHE_MAX_MB"] = "0"
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from bench_prepare import make_frame  # noqa: E402
+from sales_dashboard.charts import CHART_RENDERERS  # noqa: E402
+from sales_dashboard.datasets import registry  # noqa: E402
+from sales_dashboard.ingest import prepare_dataframe  # noqa: E402
+from sales_dashboard.report import build_report  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark PDF report chart renderers.")
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    df, cost_col = prepare_dataframe(make_frame(args.rows))
+    ds = registry.add(df, cost_col)
+    print(f"{args.rows:,} rows, median of {args.runs} runs (first, warm-up run excluded)")
+    print(f"{'renderer':>10} {'latency (s)':>12} {'size (KB)':>10}")
+    for renderer in CHART_RENDERERS:
+        build_report(ds, renderer=renderer)
+        times = []
+        for _ in range(args.runs):
+            t = time.perf_counter()
+            pdf = build_report(ds, renderer=renderer)
+            times.append(time.perf_counter() - t)
+        print(f"{renderer:>10} {statistics.median(times):>12.3f} {len(pdf) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+# benchmarks/import_report.py
+# Cold-start cost of one dashboard worker: per-package import time (from
+# `python -X importtime`) and resident memory once the app module is imported,
+# measured in a fresh interpreter.
+#
+#   python benchmarks/import_report.py                  # import sales_dashboard.web
+#   python benchmarks/import_report.py --preload        # ... plus the PDF report stack
+#   python benchmarks/import_report.py --top 30 --json
+
+import argparse, json, os, subprocess, sys
+from collections import defaultdict
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+
+CHILD = """
+import json, resource, time
+t = time.perf_counter()
+import {module}
+if {preload}:
+    from sales_dashboard import preload_report_libs
+    preload_report_libs()
+seconds = time.perf_counter() - t
+rss_kb = None
+try:
+    with open("/proc/self/status") as f:
+        rss_kb = next(int(line.split()[1]) for line in f if line.startswith("VmRSS:"))
+except (OSError, StopIteration):
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({{"seconds": seconds, "rss_kb": rss_kb}}))
+"""
+
+
+def parse_importtime(stderr):
+    """Self import time in microseconds and module count, per top-level package."""
+    self_us, modules = defaultdict(int), defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        own, _, name = line[len("import time:"):].split("|", 2)
+        package = name.strip().split(".")[0]
+        self_us[package] += int(own)
+        modules[package] += 1
+    return self_us, modules
+
+
+def run(module, preload):
+    code = CHILD.format(module=module, preload=bool(preload))
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=ROOT,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        sys.exit(proc.stderr)
+    summary = json.loads(proc.stdout.strip().splitlines()[-1])
+    self_us, modules = parse_importtime(proc.stderr)
+    packages = sorted(self_us, key=self_us.get, reverse=True)
+    return {
+        "module": module,
+        "preload": bool(preload),
+        "import_seconds": round(summary["seconds"], 3),
+        "rss_mb": round(summary["rss_kb"] / 1024, 1) if summary["rss_kb"] else None,
+        "packages": [{"package": p, "self_ms": round(self_us[p] / 1000, 1), "modules": modules[p]} for p in packages],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Report per-package import cost and RSS of a dashboard worker.")
+    parser.add_argument("--module", default="sales_dashboard.web")
+    parser.add_argument("--preload", action="store_true", help="also import the PDF report stack")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--json", action="store_true", help="print the full report as JSON")
+    args = parser.parse_args()
+
+    report = run(args.module, args.preload)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"import {report['module']}{' + report stack' if report['preload'] else ''}: "
+          f"{report['import_seconds'] * 1000:.0f} ms, RSS {report['rss_mb']} MB")
+    print(f"{'package':<24}{'self ms':>10}{'modules':>10}")
+    for row in report["packages"][:args.top]:
+        print(f"{row['package']:<24}{row['self_ms']:>10.1f}{row['modules']:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,17 @@
+# gunicorn.conf.py
+# Picked up by gunicorn when started from this directory:
+#
+#   gunicorn app:app
+#
+# The master imports the app and the report stack once (workers share those
+# pages); each worker then starts its own renderer pool, which rasterizes
+# charts and lays out report pages for that worker's exports. A pool's
+# processes cannot be shared across a fork.
+
+preload_app = True
+raw_env = ["PRELOAD_REPORT_LIBS=1"]
+
+
+def post_fork(server, worker):
+    from sales_dashboard.charts import warm_renderers
+    warm_renderers()
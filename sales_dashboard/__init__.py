@@ -0,0 +1,19 @@
+# sales_dashboard
+# Sales dashboard web app. The Flask app is sales_dashboard.web:app; importing
+# the package itself stays cheap because chart-rendering worker processes import
+# it too.
+
+# Heavy modules used only for PDF reports
+REPORT_LIBS = ("plotly.express", "plotly.io", "kaleido", "reportlab.pdfgen.canvas", "reportlab.platypus")
+
+
+def preload_report_libs():
+    """Import the report stack now instead of on the first export.
+
+    Call this in a pre-fork master (e.g. gunicorn --preload) so forked workers
+    share the already-imported modules' memory pages.
+    """
+    import importlib
+    for name in REPORT_LIBS:
+        importlib.import_module(name)
+    from . import report  # noqa: F401
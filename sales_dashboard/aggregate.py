@@ -0,0 +1,114 @@
+# aggregate.py
+# Vectorized group-by aggregation over a registered dataset. Used by /aggregate so
+# the dashboard can fetch grouped KPI/chart series instead of scanning every row
+# in the browser.
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from .datasets import FILTER_COLUMNS
+from .cube import CUBE_MEASURES, build_cube
+
+# Datasets above this many rows are aggregated server-side by the dashboard
+AGG_SERVER_THRESHOLD = int(os.environ.get("AGG_SERVER_THRESHOLD", "50000"))
+
+MEASURES = ["sales", "cost", "profit", "count", "customers"]
+
+
+def _sum_columns(cost_col):
+    return {"sales": "Selling Price", "cost": cost_col, "profit": "__Profit"}
+
+
+def _json_keys(values):
+    return [None if (isinstance(v, float) and np.isnan(v)) else v for v in values.tolist()]
+
+
+def validate_query(query):
+    dims = list(query.get("dimensions") or [])
+    measures = list(query.get("measures") or [])
+    bad_dims = [d for d in dims if d not in FILTER_COLUMNS]
+    bad_measures = [m for m in measures if m not in MEASURES]
+    if bad_dims:
+        raise ValueError(f"Unknown dimension(s): {', '.join(map(str, bad_dims))}")
+    if bad_measures:
+        raise ValueError(f"Unknown measure(s): {', '.join(map(str, bad_measures))}")
+    if not measures:
+        raise ValueError("At least one measure is required.")
+    return dims, measures
+
+
+def run_query(df, cost_col, dimensions, measures):
+    """Group `df` by `dimensions` and compute `measures`.
+
+    Returns {"dimensions": [...], "groups": {column: [...]}} with one entry per
+    group in first-appearance order; without dimensions there is a single group.
+    """
+    sum_cols = _sum_columns(cost_col)
+    names = df["Customer Name"]
+    names = names.where(names.notna() & (names != ""))
+
+    if not dimensions:
+        groups = {}
+        for m in measures:
+            if m in sum_cols:
+                groups[m] = [float(df[sum_cols[m]].sum())]
+            elif m == "count":
+                groups[m] = [int(len(df))]
+            else:
+                groups[m] = [int(names.nunique())]
+        return {"dimensions": [], "groups": groups}
+
+    keys = [df[d] for d in dimensions]
+    result = {}
+    summed = [m for m in measures if m in sum_cols]
+    if summed:
+        frame = df[[sum_cols[m] for m in summed]]
+        frame.columns = summed
+        sums = frame.groupby(keys, sort=False, dropna=False).sum()
+        for m in summed:
+            result[m] = sums[m]
+    if "count" in measures:
+        result["count"] = df.groupby(keys, sort=False, dropna=False).size()
+    if "customers" in measures:
+        result["customers"] = names.groupby(keys, sort=False, dropna=False).nunique()
+
+    table = pd.DataFrame(result)
+    index = table.index.to_frame(index=False)
+    index.columns = dimensions
+    groups = {d: _json_keys(index[d]) for d in dimensions}
+    for m in measures:
+        col = table[m]
+        groups[m] = col.astype(int if m in ("count", "customers") else float).tolist()
+    return {"dimensions": dimensions, "groups": groups}
+
+
+def aggregate(ds, filters, queries):
+    """Run several group-by queries against one filtered view of a dataset.
+
+    Additive measures are rolled up from the dataset's cube; only distinct
+    customer counts need the filtered raw rows.
+    """
+    parsed = [validate_query(q) for q in queries]
+    cube = ds.derived("cube", build_cube)
+    rows = None
+
+    def filtered_rows():
+        nonlocal rows
+        if rows is None:
+            rows, _ = ds.select(filters)
+        return rows
+
+    results = []
+    for dims, measures in parsed:
+        if cube.covers(measures):
+            results.append(cube.rollup(filters, dims, measures))
+        elif not dims:
+            additive = [m for m in measures if m in CUBE_MEASURES]
+            groups = cube.rollup(filters, [], additive)["groups"] if additive else {}
+            groups.update(run_query(filtered_rows(), ds.cost_col, [], ["customers"])["groups"])
+            results.append({"dimensions": [], "groups": {m: groups[m] for m in measures}})
+        else:
+            results.append(run_query(filtered_rows(), ds.cost_col, dims, measures))
+    return results
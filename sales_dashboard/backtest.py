@@ -0,0 +1,186 @@
+# backtest.py
+# Rolling-origin backtests of the monthly forecast methods. Every series is cut
+# off at every month, each method forecasts the next `horizon` months from the
+# data before the cutoff, and the forecasts are scored against what actually
+# happened. All cutoffs of all series are computed as one array operation: the
+# trend fit at a cutoff only needs prefix sums of (1, t, t^2, y, ty).
+#
+#   python -m sales_dashboard.backtest sales.xlsx
+#   python -m sales_dashboard.backtest sales.xlsx --by Product --horizon 6 --workers 4 --json
+
+import argparse, json, multiprocessing, os, sys, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from .forecast import (FORECAST_MAX_HORIZON, FORECAST_METHODS, MIN_TREND_MONTHS, history_start, monthly_matrix,
+                       season_columns, smooth_levels)
+
+BACKTEST_METHODS = FORECAST_METHODS
+# Series per array chunk (bounds memory: chunk x cutoffs x horizon per method)
+BACKTEST_CHUNK_SERIES = int(os.environ.get("BACKTEST_CHUNK_SERIES", "2000"))
+# Below this many series the backtest runs in-process; above it chunks go to a process pool
+BACKTEST_PARALLEL_MIN_SERIES = int(os.environ.get("BACKTEST_PARALLEL_MIN_SERIES", "5000"))
+# Pool size for backtests run inside a web request (1 = never start a pool per request)
+BACKTEST_WORKERS = max(1, int(os.environ.get("BACKTEST_WORKERS", "1")))
+
+
+def _prefix(x):
+    # Column c holds the sum over columns < c
+    return np.concatenate([np.zeros((x.shape[0], 1)), np.cumsum(x, axis=1)], axis=1)
+
+
+def method_forecasts(sales, horizon, min_train=MIN_TREND_MONTHS):
+    """Backtest forecasts of every method for every series, cutoff and step.
+
+    Returns (forecasts, actual, valid): {method: array (series, cutoffs,
+    horizon)}, the matching actual values, and a mask of the points that are
+    scored (target month inside the data, at least `min_train` months with
+    sales before the cutoff). Methods fall back to the naive forecast where
+    they cannot be computed, like ForecastState.project() does.
+    """
+    n_series, n_months = sales.shape
+    start = history_start(sales)
+    cutoffs = np.arange(1, n_months)                  # train on columns < cutoff
+    steps = np.arange(1, horizon + 1)
+    target = cutoffs[:, None] + steps[None, :] - 1    # (cutoffs, horizon) column forecast
+
+    t = np.arange(n_months, dtype=float)
+    w = (sales != 0).astype(float)  # trend and mean fit the months with sales only, like window_sums()
+    wy = w * sales
+    n, st, stt, sy, sty = (_prefix(x)[:, cutoffs] for x in (w, w * t, w * t * t, wy, wy * t))
+    denom = n * stt - st * st
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(denom > 0, (n * sty - st * sy) / denom, 0.0)
+        a = np.where(n > 0, (sy - b * st) / n, 0.0)
+        mean = np.where(n > 0, sy / n, 0.0)
+
+    naive = np.broadcast_to(sales[:, cutoffs - 1][:, :, None], (n_series, len(cutoffs), horizon))
+    trend = a[:, :, None] + b[:, :, None] * target[None]
+    trend = np.where((n >= MIN_TREND_MONTHS)[:, :, None] & np.isfinite(trend), trend, naive)
+    # Same month one season before the target, always before the cutoff
+    season_col = season_columns(cutoffs[:, None] - 1, horizon)
+    seasonal = sales[:, np.clip(season_col, 0, None)]
+    seasonal = np.where(season_col[None] >= start[:, None, None], seasonal, naive)
+
+    forecasts = {
+        "trend": trend,
+        "naive": naive,
+        "seasonal_naive": seasonal,
+        "mean": np.broadcast_to(mean[:, :, None], naive.shape),
+        "smooth": np.broadcast_to(smooth_levels(sales, start)[:, cutoffs - 1][:, :, None], naive.shape),
+    }
+    forecasts = {m: np.maximum(f, 0.0) for m, f in forecasts.items()}
+    actual = sales[:, np.clip(target, None, n_months - 1)]
+    valid = (target < n_months)[None] & (n >= min_train)[:, :, None]
+    return forecasts, actual, valid
+
+
+def _error_sums(sales, horizon, min_train):
+    """Per-method error sums and counts for one chunk of series (mergeable by addition)."""
+    forecasts, actual, valid = method_forecasts(sales, horizon, min_train)
+    sums = {}
+    for method, f in forecasts.items():
+        err = np.abs(f - actual)[valid]
+        a, f = np.abs(actual[valid]), f[valid]
+        nonzero, denom = a > 0, a + f
+        sums[method] = np.array([
+            err.sum(), err.size,
+            (err[nonzero] / a[nonzero]).sum(), nonzero.sum(),
+            (2 * err[denom > 0] / denom[denom > 0]).sum(), (denom > 0).sum(),
+        ])
+    return sums
+
+
+def backtest(sales, horizon=3, min_train=6, workers=1):
+    """Score every method on rolling-origin forecasts of the rows of `sales`.
+
+    Returns {method: {"mae", "mape", "smape", "points"}}, MAPE and sMAPE in
+    percent (None when nothing could be scored). Series are processed in
+    chunks of BACKTEST_CHUNK_SERIES; with `workers` > 1 and at least
+    BACKTEST_PARALLEL_MIN_SERIES series the chunks run in a process pool.
+    """
+    horizon = min(max(int(horizon), 1), FORECAST_MAX_HORIZON)
+    min_train = max(int(min_train), 1)
+    chunks = [sales[i:i + BACKTEST_CHUNK_SERIES] for i in range(0, len(sales), BACKTEST_CHUNK_SERIES)]
+    if workers > 1 and len(chunks) > 1 and len(sales) >= BACKTEST_PARALLEL_MIN_SERIES:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(min(workers, len(chunks)), mp_context=ctx) as pool:
+            parts = list(pool.map(_error_sums, chunks, [horizon] * len(chunks), [min_train] * len(chunks)))
+    else:
+        parts = [_error_sums(chunk, horizon, min_train) for chunk in chunks]
+
+    scores = {}
+    for method in BACKTEST_METHODS:
+        abs_err, n, ape, n_ape, sape, n_sape = sum((p[method] for p in parts), np.zeros(6))
+        scores[method] = {
+            "mae": float(abs_err / n) if n else None,
+            "mape": float(ape / n_ape * 100) if n_ape else None,
+            "smape": float(sape / n_sape * 100) if n_sape else None,
+            "points": int(n),
+        }
+    return scores
+
+
+def best_method(scores, metric="smape"):
+    scored = [(s[metric], m) for m, s in scores.items() if s[metric] is not None]
+    return min(scored)[1] if scored else None
+
+
+def backtest_dataset(ds, filters=None, by=None, horizon=3, min_train=6, workers=1):
+    """Backtest report for the filtered view of `ds` (one series per `by` segment)."""
+    months, segments, sales = monthly_matrix(ds, filters, by)
+    scores = backtest(sales, horizon, min_train, workers) if sales.shape[1] > 1 else {}
+    return {
+        "by": by,
+        "series": len(segments),
+        "months": int(sales.shape[1]),
+        "horizon": min(max(int(horizon), 1), FORECAST_MAX_HORIZON),
+        "min_train": int(min_train),
+        "methods": scores,
+        "best": best_method(scores) if scores else None,
+    }
+
+
+def _fmt(value, spec):
+    return "—" if value is None else format(value, spec)
+
+
+def main(argv=None):
+    from .datasets import FILTER_COLUMNS, Dataset
+    from .ingest import load_upload
+
+    parser = argparse.ArgumentParser(description="Backtest the monthly sales forecast methods on a workbook.")
+    parser.add_argument("workbook", help=".xlsx or .csv upload")
+    parser.add_argument("--by", choices=FILTER_COLUMNS, default=None, help="one series per value of this column")
+    parser.add_argument("--horizon", type=int, default=3)
+    parser.add_argument("--min-train", type=int, default=6, help="months of history before a cutoff is scored")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--filters", default=None, help='filter spec as JSON, e.g. \'{"Country": ["India"]}\'')
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    try:
+        filters = json.loads(args.filters) if args.filters else None
+    except ValueError as e:
+        parser.error(f"--filters is not valid JSON: {e}")
+    with open(args.workbook, "rb") as f:
+        df, cost_col = load_upload(f)
+    t = time.perf_counter()
+    report = backtest_dataset(Dataset(df, cost_col), filters, args.by, args.horizon, args.min_train, args.workers)
+    seconds = time.perf_counter() - t
+    if args.json:
+        print(json.dumps({**report, "seconds": round(seconds, 3)}, indent=2))
+        return 0
+    print(f"{report['series']} series x {report['months']} months, horizon {report['horizon']}, "
+          f"min {report['min_train']} months of history; {seconds:.2f} s")
+    print(f"{'method':<16}{'MAE':>14}{'MAPE %':>10}{'sMAPE %':>10}{'points':>10}")
+    for method, s in report["methods"].items():
+        marker = "  *" if method == report["best"] else ""
+        print(f"{method:<16}{_fmt(s['mae'], ',.0f'):>14}{_fmt(s['mape'], '.1f'):>10}"
+              f"{_fmt(s['smape'], '.1f'):>10}{s['points']:>10,}{marker}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+# batch.py
+# Month-end batch reports: runs the same upload preparation and PDF report
+# pipeline as the dashboard's "Download PDF" over many workbooks, one file per
+# process across all cores, and prints a per-file timing summary.
+#
+#   python -m sales_dashboard.batch regions/ -o reports/
+#   python -m sales_dashboard.batch "regions/*.xlsx" extra.csv -o reports/ --workers 4
+#   python -m sales_dashboard.batch regions/ -o reports/ --filters '{"Country": ["India"]}'
+
+import argparse, glob, json, os, sys, time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .jobs import DEFAULT_REPORT_APPENDIX, REPORT_APPENDIX_MODES
+
+UPLOAD_EXTENSIONS = (".xlsx", ".csv")
+
+
+def find_workbooks(inputs):
+    """Workbook paths from files, directories and glob patterns (sorted, de-duplicated)."""
+    found = []
+    for item in inputs:
+        if os.path.isdir(item):
+            paths = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            paths = glob.glob(item) or [item]
+        found += [p for p in paths if p.lower().endswith(UPLOAD_EXTENSIONS) and os.path.isfile(p)]
+    return sorted(set(found))
+
+
+def output_paths(paths, out_dir):
+    """Report path per workbook: <stem>.pdf, or <stem>_2.pdf, ... where stems collide
+    (east/sales.xlsx and west/sales.xlsx, or x.csv and x.xlsx)."""
+    outputs, taken = [], set()
+    for path in paths:
+        base = os.path.splitext(os.path.basename(path))[0]
+        name, n = f"{base}.pdf", 1
+        while name.lower() in taken:  # case-insensitive filesystems clash too
+            n += 1
+            name = f"{base}_{n}.pdf"
+        taken.add(name.lower())
+        outputs.append(os.path.join(out_dir, name))
+    return outputs
+
+
+def run_one(path, out, filters=None, options=None):
+    """Prepare one workbook and write its report to `out`; returns a timing record."""
+    from .datasets import Dataset
+    from .ingest import load_upload
+    from .report import build_report
+
+    record = {"file": path, "output": None, "rows": 0, "load_s": 0.0, "report_s": 0.0, "bytes": 0, "error": None}
+    try:
+        t0 = time.perf_counter()
+        with open(path, "rb") as f:
+            df, cost_col = load_upload(f)
+        ds = Dataset(df, cost_col)
+        t1 = time.perf_counter()
+        pdf = build_report(ds, filters, **(options or {}))
+        t2 = time.perf_counter()
+        with open(out, "wb") as f:
+            f.write(pdf)
+        record.update(output=out, rows=len(ds), load_s=t1 - t0, report_s=t2 - t1, bytes=len(pdf))
+    except Exception as e:
+        record["error"] = f"{type(e).__name__}: {e}"
+    return record
+
+
+def print_summary(records, wall):
+    width = max([len(os.path.basename(r["file"])) for r in records] + [4])
+    print(f"{'file':<{width}} {'rows':>10} {'load s':>8} {'report s':>9} {'total s':>8} {'KB':>8}  status")
+    for r in records:
+        status = f"ok: {os.path.basename(r['output'])}" if r["error"] is None else r["error"]
+        print(f"{os.path.basename(r['file']):<{width}} {r['rows']:>10,} {r['load_s']:>8.2f} {r['report_s']:>9.2f} "
+              f"{r['load_s'] + r['report_s']:>8.2f} {r['bytes'] / 1024:>8.1f}  {status}")
+    busy = sum(r["load_s"] + r["report_s"] for r in records)
+    failed = sum(r["error"] is not None for r in records)
+    print(f"{len(records)} file(s), {failed} failed; {busy:.2f} s of work in {wall:.2f} s wall time")
+
+
+def main(argv=None):
+    # Files are already spread over the cores; each worker renders its own charts
+    # serially. Set before .charts is imported so forked workers inherit it.
+    os.environ.setdefault("PDF_CHART_WORKERS", "1")
+    from .charts import CHART_RENDERERS
+
+    parser = argparse.ArgumentParser(description="Generate PDF sales reports for many workbooks.")
+    parser.add_argument("inputs", nargs="+", help="workbook files, directories or glob patterns (.xlsx/.csv)")
+    parser.add_argument("-o", "--out-dir", required=True, help="directory the PDFs are written to")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="parallel files (default: all cores)")
+    parser.add_argument("--filters", default=None, help='filter spec as JSON, e.g. \'{"Country": ["India"]}\'')
+    parser.add_argument("--renderer", choices=CHART_RENDERERS, default=None, help="chart renderer")
+    parser.add_argument("--appendix", choices=REPORT_APPENDIX_MODES, default=DEFAULT_REPORT_APPENDIX)
+    args = parser.parse_args(argv)
+
+    paths = find_workbooks(args.inputs)
+    if not paths:
+        parser.error("no .xlsx or .csv files found")
+    try:
+        filters = json.loads(args.filters) if args.filters else None
+    except ValueError as e:
+        parser.error(f"--filters is not valid JSON: {e}")
+    options = {"appendix": args.appendix}
+    if args.renderer:
+        options["renderer"] = args.renderer
+    os.makedirs(args.out_dir, exist_ok=True)
+
+    t0 = time.perf_counter()
+    workers = max(1, min(args.workers, len(paths)))
+    records = []
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_one, p, out, filters, options)
+                   for p, out in zip(paths, output_paths(paths, args.out_dir))]
+        for future in as_completed(futures):
+            r = future.result()
+            records.append(r)
+            print(f"{'done' if r['error'] is None else 'FAILED'}: {r['file']}", file=sys.stderr)
+    records.sort(key=lambda r: paths.index(r["file"]))
+    print_summary(records, time.perf_counter() - t0)
+    return 1 if any(r["error"] for r in records) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
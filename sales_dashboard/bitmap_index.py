@@ -0,0 +1,88 @@
+# bitmap_index.py
+# Row selection and facet counts for the filter columns. Low-cardinality
+# columns get one packed bitset per distinct value, so a filter is OR across the
+# selected values of a column and AND across columns, touching n/8 bytes per
+# bitmap. Columns with many values (e.g. Product) keep their factorized codes
+# instead: a value's bitmap would cost n/8 bytes and a full pass to build, while
+# the codes cost one array per column, a gather per filter and a bincount per
+# facet.
+
+import os
+
+import numpy as np
+
+from .cube import dimension_codes
+from .datasets import FILTER_COLUMNS, normalize_filters
+
+# Columns with more distinct values than this are indexed by codes (4n bytes, i.e. 32 bitmaps)
+BITMAP_MAX_VALUES = int(os.environ.get("BITMAP_MAX_VALUES", "32"))
+
+# Set bits per byte value
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def popcount(bits):
+    """Number of set bits in a packed uint8 array (summed over the last axis)."""
+    return _POPCOUNT[bits].sum(axis=-1, dtype=np.int64)
+
+
+class BitmapIndex:
+    def __init__(self, frame):
+        self.n = len(frame)
+        self.values = {}
+        self.lookup = {}
+        self.bitmaps = {}  # dim -> (values, n/8 bytes) packed bitsets
+        self.codes = {}    # dim -> per-row value codes, for high-cardinality columns
+        for dim in FILTER_COLUMNS:
+            codes, values, self.lookup[dim] = dimension_codes(frame[dim])
+            self.values[dim] = values.tolist()
+            if len(values) > BITMAP_MAX_VALUES:
+                self.codes[dim] = codes
+                continue
+            bitmaps = np.empty((len(values), (self.n + 7) // 8), dtype=np.uint8)
+            for k in range(len(values)):
+                bitmaps[k] = np.packbits(codes == k)
+            self.bitmaps[dim] = bitmaps
+        self._all = np.packbits(np.ones(self.n, dtype=bool))
+
+    def selection(self, filters=None):
+        """Packed bitset of the rows matching a filter spec."""
+        sel = self._all.copy()
+        for dim, values in normalize_filters(filters).items():
+            ids = [self.lookup[dim][v] for v in values if v in self.lookup[dim]]
+            if not ids:
+                sel[:] = 0
+            elif dim in self.codes:
+                member = np.zeros(len(self.values[dim]), dtype=bool)
+                member[ids] = True
+                sel &= np.packbits(member[self.codes[dim]])
+            else:
+                sel &= np.bitwise_or.reduce(self.bitmaps[dim][ids], axis=0)
+        return sel
+
+    def mask(self, filters=None):
+        """Boolean row mask for a filter spec."""
+        return np.unpackbits(self.selection(filters), count=self.n).astype(bool)
+
+    def facets(self, filters=None):
+        """Values still reachable under a filter spec, with their row counts, per filter column."""
+        sel = self.selection(filters)
+        rows = None
+        out = {}
+        for dim in FILTER_COLUMNS:
+            if dim in self.codes:
+                if rows is None:
+                    rows = np.unpackbits(sel, count=self.n).astype(bool)
+                counts = np.bincount(self.codes[dim][rows], minlength=len(self.values[dim]))
+            else:
+                counts = popcount(self.bitmaps[dim] & sel)
+            present = np.flatnonzero(counts)
+            out[dim] = {
+                "values": [self.values[dim][i] for i in present],
+                "counts": counts[present].tolist(),
+            }
+        return {"total": int(popcount(sel)), "facets": out}
+
+
+def build_bitmap_index(ds):
+    return BitmapIndex(ds.frame)
@@ -0,0 +1,230 @@
+# cache.py
+# Size-bounded on-disk caches. Entries are plain files named after their key;
+# a hit refreshes the file's mtime, and eviction removes the least recently
+# used files once the directory grows past its byte budget.
+#
+# Cached frames may be pickles and cached reports are served as they are, so
+# the cache root must be private to the server's user (checked at import).
+
+import hashlib, json, os, pickle, stat, tempfile, threading
+
+from .datasets import normalize_filters
+from .ingest import upload_format
+
+
+def private_dir(path):
+    """Create `path` (mode 0700) or check an existing one: a real directory,
+    owned by this user and not writable by anyone else."""
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode) or (
+            hasattr(os, "getuid") and (st.st_uid != os.getuid() or st.st_mode & 0o022)):
+        raise RuntimeError(f"Cache directory {path} must be a directory owned by this user and writable "
+                           f"only by it; point SALES_CACHE_DIR elsewhere.")
+    return path
+
+
+# One directory per user under the shared temp dir, so no other account can plant entries
+CACHE_ROOT = private_dir(os.environ.get("SALES_CACHE_DIR") or os.path.join(
+    tempfile.gettempdir(), f"sales_dashboard-{os.getuid()}" if hasattr(os, "getuid") else "sales_dashboard"))
+PARSE_CACHE_MAX_MB = int(os.environ.get("PARSE_CACHE_MAX_MB", "512"))
+REPORT_CACHE_MAX_MB = int(os.environ.get("REPORT_CACHE_MAX_MB", "256"))
+# Bump when the report layout changes so stale PDFs are never served
+REPORT_CACHE_VERSION = 1
+# Bump when upload preparation (ingest) changes so stale frames are never served
+PARSE_CACHE_VERSION = 1
+
+
+class DiskCache:
+    """Least-recently-used file cache with hit/miss counters."""
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key, ext=""):
+        return os.path.join(self.directory, key + ext)
+
+    def lookup(self, key, exts=("",)):
+        """Return the path of a cached entry (refreshing its LRU position) or None."""
+        for ext in exts:
+            path = self.path(key, ext)
+            try:
+                os.utime(path)
+            except OSError:
+                continue
+            with self._lock:
+                self.hits += 1
+            return path
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def store(self, key, write, ext=""):
+        """Atomically create an entry; `write(path)` fills a temporary file."""
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, self.path(key, ext))
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        self.evict()
+        return self.path(key, ext)
+
+    def _entries(self):
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and not entry.name.endswith(".tmp"):
+                st = entry.stat()
+                yield entry.path, st.st_size, st.st_mtime
+
+    def evict(self):
+        entries = sorted(self._entries(), key=lambda e: e[2])
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def stats(self):
+        entries = list(self._entries())
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "entries": len(entries),
+            "bytes": sum(size for _, size, _ in entries),
+            "max_bytes": self.max_bytes,
+        }
+
+
+def upload_digest(file, block_size=1 << 20):
+    """Parse cache key of an upload: SHA-256 of PARSE_CACHE_VERSION, its format and its bytes.
+
+    The same bytes parse differently as .csv and .xlsx. The stream is rewound afterwards.
+    """
+    stream = getattr(file, "stream", file)
+    stream.seek(0)
+    h = hashlib.sha256(f"{PARSE_CACHE_VERSION}\0{upload_format(file)}\0".encode("utf-8"))
+    for block in iter(lambda: stream.read(block_size), b""):
+        h.update(block)
+    stream.seek(0)
+    return h.hexdigest()
+
+
+class ParseCache:
+    """Prepared upload frames keyed by upload_digest().
+
+    Frames are stored as Arrow/Feather files when pyarrow is available (and the
+    columns are Arrow-compatible), otherwise pickled.
+    """
+
+    def __init__(self, directory=os.path.join(CACHE_ROOT, "parse"), max_bytes=PARSE_CACHE_MAX_MB << 20):
+        self.disk = DiskCache(directory, max_bytes)
+
+    def load(self, digest):
+        path = self.disk.lookup(digest, exts=(".feather", ".pkl"))
+        if path is None:
+            return None
+        try:
+            if path.endswith(".feather"):
+                from pyarrow import feather
+                table = feather.read_table(path, memory_map=True)
+                cost_col = table.schema.metadata[b"cost_col"].decode("utf-8")
+                return table.to_pandas(), cost_col
+            with open(path, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Unreadable entry (partial write, format change): treat it as a miss
+            return None
+
+    def store(self, digest, frame, cost_col):
+        try:
+            import pyarrow as pa
+            from pyarrow import feather
+            table = pa.Table.from_pandas(frame, preserve_index=False)
+        except (ImportError, TypeError, ValueError, NotImplementedError):
+            table = None
+        if table is not None:
+            metadata = {**(table.schema.metadata or {}), b"cost_col": cost_col.encode("utf-8")}
+            table = table.replace_schema_metadata(metadata)
+            self.disk.store(digest, lambda p: feather.write_feather(table, p), ext=".feather")
+        else:
+            def write(p):
+                with open(p, "wb") as f:
+                    pickle.dump((frame, cost_col), f, protocol=pickle.HIGHEST_PROTOCOL)
+            self.disk.store(digest, write, ext=".pkl")
+
+    def stats(self):
+        return self.disk.stats()
+
+
+parse_cache = ParseCache()
+
+
+class DatasetHeads:
+    """Content hash and version of appended datasets, shared by all worker processes.
+
+    One small JSON file per dataset id; a dataset without one is still the
+    content its id was minted from.
+    """
+
+    def __init__(self, directory=os.path.join(CACHE_ROOT, "datasets")):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, dataset_id):
+        return os.path.join(self.directory, dataset_id + ".json")
+
+    def load(self, dataset_id):
+        try:
+            with open(self.path(dataset_id), encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def store(self, dataset_id, content_hash, version):
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump({"content_hash": content_hash, "version": version}, f)
+        os.replace(tmp, self.path(dataset_id))
+
+    def clear(self, dataset_id):
+        try:
+            os.remove(self.path(dataset_id))
+        except OSError:
+            pass
+
+
+dataset_heads = DatasetHeads()
+
+
+def report_key(ds, filters=None, **options):
+    """Cache key of a PDF report: dataset content + filter spec + report options.
+
+    None for datasets without a content hash, which are never cached.
+    """
+    if not ds.content_hash:
+        return None
+    spec = {
+        "version": REPORT_CACHE_VERSION,
+        "data": ds.content_hash,
+        # Filter values are sets as far as the report is concerned
+        "filters": {dim: sorted(values, key=lambda v: (type(v).__name__, str(v)))
+                    for dim, values in normalize_filters(filters).items()},
+        "options": options,
+    }
+    return hashlib.sha256(json.dumps(spec, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+
+report_cache = DiskCache(os.path.join(CACHE_ROOT, "report_cache"), REPORT_CACHE_MAX_MB << 20)
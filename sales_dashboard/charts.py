@@ -0,0 +1,173 @@
+# charts.py
+# PNG rasterization of report figures. Every Kaleido call is a multi-second
+# round trip, so figures are rendered in a long-lived pool of pre-warmed worker
+# processes (each keeps its Kaleido/Chromium subprocess alive between requests)
+# and handed back in the order they were given. Finished PNGs are cached on disk
+# by a hash of the figure spec, so re-exporting the same view skips rendering.
+# Report page layout (reportlab) runs in the same pool via run_in_pool(), off
+# the web process's GIL.
+
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from .cache import CACHE_ROOT, DiskCache
+
+# Max charts rasterized at once; 1 renders serially in the calling process
+CHART_WORKERS = max(1, int(os.environ.get("PDF_CHART_WORKERS", "3")))
+# A render taking longer than this is treated as a hung worker
+CHART_TIMEOUT = float(os.environ.get("PDF_CHART_TIMEOUT", "60"))
+# Idle pools are pinged before use when their last check is older than this
+CHART_HEALTH_INTERVAL = float(os.environ.get("PDF_CHART_HEALTH_INTERVAL", "30"))
+CHART_CACHE_MAX_MB = int(os.environ.get("CHART_CACHE_MAX_MB", "128"))
+
+# "kaleido" rasterizes plotly figures here; "vector" draws them with reportlab (see vector_charts)
+CHART_RENDERERS = ("kaleido", "vector")
+DEFAULT_CHART_RENDERER = os.environ.get("PDF_CHART_RENDERER", "kaleido")
+
+chart_cache = DiskCache(os.path.join(CACHE_ROOT, "charts"), CHART_CACHE_MAX_MB << 20)
+
+_pool = None
+_pool_checked = 0.0
+_pool_lock = threading.Lock()
+
+
+def _to_png(spec, width, height, scale):
+    import plotly.io as pio
+    return pio.to_image(pio.from_json(spec), format="png", width=width, height=height, scale=scale)
+
+
+def _warm_up():
+    # First to_image call starts the Kaleido subprocess; later calls reuse it.
+    # The rest of the report stack is imported for layout tasks.
+    from . import preload_report_libs
+    preload_report_libs()
+    _to_png('{"data": [{"type": "bar", "x": [0], "y": [0]}]}', 10, 10, 1)
+    return os.getpid()
+
+
+def _ping():
+    return os.getpid()
+
+
+def _kill(pool):
+    # shutdown() alone would wait on a hung worker forever
+    for proc in list((getattr(pool, "_processes", None) or {}).values()):
+        proc.terminate()
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _start_pool():
+    pool = ProcessPoolExecutor(CHART_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    for _ in range(CHART_WORKERS):
+        pool.submit(_warm_up)
+    return pool
+
+
+def _get_pool(restart=False):
+    """The shared renderer pool, (re)started when missing, broken or unresponsive."""
+    global _pool, _pool_checked
+    with _pool_lock:
+        now = time.monotonic()
+        if _pool is not None and not restart and now - _pool_checked > CHART_HEALTH_INTERVAL:
+            try:
+                _pool.submit(_ping).result(timeout=CHART_TIMEOUT)
+            except Exception:
+                restart = True
+            _pool_checked = now
+        if _pool is not None and restart:
+            print("Chart renderer pool restarted")
+            _kill(_pool)
+            _pool = None
+        if _pool is None:
+            _pool = _start_pool()
+            _pool_checked = now
+        return _pool
+
+
+def warm_renderers():
+    """Start the renderer pool ahead of the first report (non-blocking)."""
+    if CHART_WORKERS > 1:
+        _get_pool()
+
+
+def run_in_pool(fn, calls):
+    """[fn(*args) for args in calls], run in the renderer pool (in order).
+
+    For long, CPU-bound work such as laying out report pages: no timeout, and
+    run in the calling process when the pool is disabled (PDF_CHART_WORKERS=1).
+    """
+    if CHART_WORKERS == 1:
+        return [fn(*args) for args in calls]
+    for attempt in (0, 1):
+        try:
+            pool = _get_pool(restart=attempt > 0)
+            pending = [pool.submit(fn, *args) for args in calls]
+            return [f.result() for f in pending]
+        except BrokenProcessPool:
+            if attempt:
+                raise
+
+
+def figure_key(spec, width, height, scale):
+    return hashlib.sha256(f"{width}x{height}@{scale}\n{spec}".encode("utf-8")).hexdigest()
+
+
+def _render(specs, width, height, scale):
+    if CHART_WORKERS == 1 or len(specs) < 2:
+        return [_to_png(spec, width, height, scale) for spec in specs]
+    for attempt in (0, 1):
+        # A dead or hung worker fails the first attempt; retry once on a fresh pool
+        try:
+            pool = _get_pool(restart=attempt > 0)
+            pending = [pool.submit(_to_png, spec, width, height, scale) for spec in specs]
+            return [f.result(timeout=CHART_TIMEOUT) for f in pending]
+        except (BrokenProcessPool, FutureTimeout):
+            if attempt:
+                raise
+
+
+def render_pngs(figures, width=1000, height=500, scale=2):
+    """PNG bytes for each figure, in input order (None where rendering failed)."""
+    specs = [fig.to_json() for fig in figures]
+    keys = [figure_key(spec, width, height, scale) for spec in specs]
+    images = [None] * len(specs)
+    todo = []
+    for i, key in enumerate(keys):
+        path = chart_cache.lookup(key, exts=(".png",))
+        if path is not None:
+            try:
+                with open(path, "rb") as f:
+                    images[i] = f.read()
+                continue
+            except OSError:
+                pass
+        todo.append(i)
+    if not todo:
+        return images
+
+    try:
+        rendered = _render([specs[i] for i in todo], width, height, scale)
+    except Exception as e:
+        # Fall back to one figure at a time so one bad chart doesn't sink the rest
+        print("Chart Error:", e)
+        rendered = []
+        for i in todo:
+            try:
+                rendered.append(_to_png(specs[i], width, height, scale))
+            except Exception as e:
+                print("Chart Error:", e)
+                rendered.append(None)
+
+    for i, png in zip(todo, rendered):
+        images[i] = png
+        if png is not None:
+            def write(p, png=png):
+                with open(p, "wb") as f:
+                    f.write(png)
+            chart_cache.store(keys[i], write, ext=".png")
+    return images
@@ -0,0 +1,87 @@
+# cube.py
+# Sparse data cube over the six dashboard filter dimensions. Built once per
+# upload; any filter combination plus group-by then rolls up the (small) set of
+# observed dimension combinations instead of scanning raw rows.
+
+import numpy as np
+import pandas as pd
+
+from .datasets import FILTER_COLUMNS, normalize_filters
+
+# Additive measures the cube can roll up ("customers" is a distinct count and is not)
+CUBE_MEASURES = ("sales", "cost", "profit", "count")
+
+
+def dimension_codes(column):
+    """Factorize a filter column: (int32 codes, values, {value: code}).
+
+    Missing values are kept as a value of their own, None, so a spec selecting
+    None matches them (here and in the bitmap index alike).
+    """
+    codes, uniques = pd.factorize(column, use_na_sentinel=False)
+    values = np.array([None if pd.isna(v) else v for v in uniques.tolist()], dtype=object)
+    return codes.astype(np.int32), values, {v: i for i, v in enumerate(values.tolist())}
+
+
+class DataCube:
+    def __init__(self, frame, cost_col):
+        self.values = {}
+        self.lookup = {}
+        cells = {}
+        for dim in FILTER_COLUMNS:
+            cells[dim], self.values[dim], self.lookup[dim] = dimension_codes(frame[dim])
+
+        base = pd.DataFrame(cells)
+        base["sales"] = frame["Selling Price"].to_numpy(dtype=float)
+        base["cost"] = frame[cost_col].to_numpy(dtype=float)
+        base["profit"] = frame["__Profit"].to_numpy(dtype=float)
+        base["count"] = 1
+        # Position of each cell's first row, so roll-ups keep first-appearance order
+        base["first"] = np.arange(len(frame))
+        grouped = base.groupby(FILTER_COLUMNS, sort=False)
+        # Cell of every row (cells are numbered in first-appearance order, like the rows of self.cells)
+        self.row_cells = grouped.ngroup().to_numpy(dtype=np.int32)
+        self.cells = (
+            grouped
+            .agg(sales=("sales", "sum"), cost=("cost", "sum"), profit=("profit", "sum"),
+                 count=("count", "sum"), first=("first", "min"))
+            .reset_index()
+        )
+
+    def __len__(self):
+        return len(self.cells)
+
+    def covers(self, measures):
+        return all(m in CUBE_MEASURES for m in measures)
+
+    def mask(self, filters):
+        keep = np.ones(len(self.cells), dtype=bool)
+        for dim, values in normalize_filters(filters).items():
+            codes = [self.lookup[dim][v] for v in values if v in self.lookup[dim]]
+            keep &= np.isin(self.cells[dim].to_numpy(), codes)
+        return keep
+
+    def rollup(self, filters, dimensions, measures):
+        """Same result shape as aggregate.run_query, computed from the cube cells."""
+        cells = self.cells[self.mask(filters)]
+        if not dimensions:
+            groups = {m: [int(cells[m].sum()) if m == "count" else float(cells[m].sum())] for m in measures}
+            return {"dimensions": [], "groups": groups}
+
+        rolled = (
+            cells.groupby(dimensions, sort=False)[list(measures) + ["first"]]
+            .agg({**{m: "sum" for m in measures}, "first": "min"})
+            .sort_values("first")
+            .reset_index()
+        )
+        groups = {}
+        for dim in dimensions:
+            keys = self.values[dim][rolled[dim].to_numpy()]
+            groups[dim] = keys.tolist()
+        for m in measures:
+            groups[m] = rolled[m].astype(int if m == "count" else float).tolist()
+        return {"dimensions": list(dimensions), "groups": groups}
+
+
+def build_cube(ds):
+    return DataCube(ds.frame, ds.cost_col)
@@ -0,0 +1,294 @@
+# datasets.py
+# Server-side registry of prepared uploads. The dashboard keeps only a dataset id
+# and a filter spec; /forecast and /download_pdf look the typed frame up here
+# instead of receiving every row back from the browser.
+#
+# Ids of uploads carry the content hash of the file, so any worker process can
+# rebuild a dataset it does not hold from the on-disk parse cache.
+
+import hashlib, hmac, os, sys, threading, time, uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import numpy as np
+import pandas as pd
+
+# Columns the dashboard filters on; a filter spec maps a subset of them to allowed values
+FILTER_COLUMNS = ["Category", "Product", "__Age Group", "Country", "Payment Mode", "__Month"]
+
+# Memory held per process (all users: frames plus derived artefacts), and datasets per user
+DATASET_REGISTRY_MAX_MB = int(os.environ.get("DATASET_REGISTRY_MAX_MB", "2048"))
+DATASETS_PER_USER = int(os.environ.get("DATASETS_PER_USER", "4"))
+
+
+def approx_nbytes(value, _seen=None):
+    """Rough memory held by a derived artefact: its arrays, frames and bytes plus
+    the containers and objects holding them."""
+    seen = set() if _seen is None else _seen
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    if isinstance(getattr(value, "nbytes", None), int):  # arrays, and artefacts that size themselves
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum() if isinstance(usage, pd.Series) else usage)
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        return size + sum(approx_nbytes(k, seen) + approx_nbytes(v, seen) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(approx_nbytes(v, seen) for v in value)
+    if hasattr(value, "__dict__"):
+        return size + approx_nbytes(vars(value), seen)
+    return size
+
+
+class Dataset:
+    """A prepared upload plus lazily built artefacts derived from it."""
+
+    def __init__(self, frame, cost_col, owner=None, content_hash=None, dataset_id=None, version=0):
+        self.id = dataset_id or uuid.uuid4().hex
+        self.frame = frame
+        self.cost_col = cost_col
+        self.owner = owner
+        self.content_hash = content_hash
+        self.version = version  # bumped by append()
+        self.created = time.time()
+        self.dates = pd.to_datetime(frame["Purchase Date"], errors="coerce")
+        self._derived = {}
+        self._building = {}  # key -> Future of a build in progress
+        self._lock = threading.RLock()
+        self.frame_bytes = int(frame.memory_usage(index=False, deep=True).sum())
+        self._sizes = {}  # key -> approx_nbytes of the memoized artefact
+        self.on_resize = None  # called after artefacts or rows are added (the registry re-checks its budget)
+
+    @property
+    def nbytes(self):
+        """Approximate memory held: the frame plus every memoized artefact."""
+        return self.frame_bytes + sum(list(self._sizes.values()))
+
+    def _resized(self):
+        if self.on_resize is not None:
+            self.on_resize(self)
+
+    def __len__(self):
+        return len(self.frame)
+
+    def derived(self, key, build):
+        """Return `build(self)`, computed once per dataset and memoized under `key`.
+
+        The build runs outside the dataset lock, so a slow artefact only holds
+        up callers waiting for that same key. A build that rows were appended
+        during is run again rather than memoized.
+        """
+        with self._lock:
+            if key in self._derived:
+                return self._derived[key]
+            pending = self._building.get(key)
+            if pending is None:
+                pending = self._building[key] = Future()
+                owner = True
+            else:
+                owner = False
+        if not owner:
+            return pending.result()
+
+        try:
+            while True:
+                version = self.version
+                value = build(self)
+                size = approx_nbytes(value)
+                with self._lock:
+                    if key in self._derived:  # built for the new rows by another caller
+                        value = self._derived[key]
+                        break
+                    if self.version == version:
+                        self._derived[key] = value
+                        self._sizes[key] = size
+                        break
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                if self._building.get(key) is pending:
+                    del self._building[key]
+        pending.set_result(value)
+        self._resized()
+        return value
+
+    def derived_async(self, key, build):
+        """Start building `key` on a background thread unless it is built or being built."""
+        with self._lock:
+            if key in self._derived or key in self._building:
+                return
+        threading.Thread(target=self.derived, args=(key, build), daemon=True).start()
+
+    def peek(self, key):
+        """The memoized artefact under `key`, or None if it is not built (yet)."""
+        with self._lock:
+            return self._derived.get(key)
+
+    def read(self, fn):
+        """Return `fn(frame, dates)` evaluated against a single version of the dataset.
+
+        Artefacts `fn` fetches through derived() then match the rows it sees;
+        if rows are appended meanwhile, `fn` runs again (also when it failed,
+        e.g. on a mask built for the longer frame).
+        """
+        while True:
+            with self._lock:
+                frame, dates, version = self.frame, self.dates, self.version
+            try:
+                result = fn(frame, dates)
+            except Exception:
+                if self.version == version:
+                    raise
+                continue
+            with self._lock:
+                if self.version == version:
+                    return result
+
+    def append(self, frame, content_hash=None):
+        """Add prepared rows (with the same columns) to the end of the dataset.
+
+        Derived artefacts are dropped and rebuilt on next use, except those
+        with an `append_rows(rows, dates)` method that folds the new rows in
+        and returns True.
+        """
+        dates = pd.to_datetime(frame["Purchase Date"], errors="coerce")
+        rows_bytes = int(frame[self.frame.columns].memory_usage(index=False, deep=True).sum())
+        with self._lock:
+            self.frame = pd.concat([self.frame, frame[self.frame.columns]], ignore_index=True)
+            self.dates = pd.concat([self.dates, dates], ignore_index=True)
+            self.frame_bytes += rows_bytes
+            self.content_hash = content_hash
+            self.version += 1
+            self._derived = {key: value for key, value in self._derived.items()
+                             if hasattr(value, "append_rows") and value.append_rows(frame, dates)}
+            self._sizes = {key: approx_nbytes(value) for key, value in self._derived.items()}
+            self._building = {}  # builds in flight see the old rows and will not be memoized
+        self._resized()
+
+    def mask(self, filters=None):
+        """Boolean row mask for a filter spec ({column: [values, ...]})."""
+        from .bitmap_index import build_bitmap_index
+        return self.derived("bitmaps", build_bitmap_index).mask(filters)
+
+    def select(self, filters=None):
+        """Filtered view of the frame (and the matching parsed dates)."""
+        spec = normalize_filters(filters)
+        def view(frame, dates):
+            if not spec:
+                return frame, dates
+            keep = self.mask(spec)
+            return frame[keep], dates[keep]
+        return self.read(view)
+
+
+def normalize_filters(filters):
+    """Drop unknown columns and empty selections from a client filter spec."""
+    if not isinstance(filters, dict):
+        return {}
+    spec = {}
+    for col in FILTER_COLUMNS:
+        values = filters.get(col)
+        if isinstance(values, (list, tuple)) and values:
+            spec[col] = [v for v in values if v is None or isinstance(v, (str, int, float))]
+    return spec
+
+
+class DatasetRegistry:
+    """Least-recently-used map of dataset id -> Dataset, bounded by bytes and datasets per user.
+
+    The byte budget covers each dataset's frame and its memoized artefacts
+    (cube, indexes, sort orders, payload bodies, ...), re-checked whenever
+    one is built or rows are appended.
+
+    Uploads with a content hash get the id "<hash>-<signature>", the signature
+    binding it to the uploading user. A worker that does not hold such a
+    dataset (another worker took the upload, or it was evicted) reloads it
+    from the parse cache, at the content and version recorded by the last
+    append (see DatasetHeads).
+    """
+
+    def __init__(self, max_bytes=DATASET_REGISTRY_MAX_MB << 20, per_user=DATASETS_PER_USER,
+                 secret=b"sales-dashboard"):
+        self.max_bytes = max_bytes
+        self.per_user = max(1, per_user)
+        self.secret = secret  # set to the app's secret key by web.py
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _signature(self, owner, content_hash):
+        key = self.secret if isinstance(self.secret, bytes) else str(self.secret).encode("utf-8")
+        return hmac.new(key, f"{owner}\0{content_hash}".encode("utf-8"), hashlib.sha256).hexdigest()[:16]
+
+    def dataset_id(self, owner, content_hash):
+        return f"{content_hash}-{self._signature(owner, content_hash)}"
+
+    def add(self, frame, cost_col, owner=None, content_hash=None):
+        dataset_id = self.dataset_id(owner, content_hash) if content_hash else None
+        ds = Dataset(frame, cost_col, owner=owner, content_hash=content_hash, dataset_id=dataset_id)
+        if dataset_id:
+            from .cache import dataset_heads
+            dataset_heads.clear(dataset_id)  # a fresh upload starts over from the file's own content
+        self._insert(ds)
+        return ds
+
+    def _insert(self, ds):
+        ds.on_resize = self._resized
+        with self._lock:
+            self._items.pop(ds.id, None)
+            self._items[ds.id] = ds
+            mine = [k for k, d in self._items.items() if d.owner == ds.owner]
+            for key in mine[:max(0, len(mine) - self.per_user)]:
+                self._items.pop(key)
+            self._evict()
+
+    def _resized(self, ds):
+        with self._lock:
+            if self._items.get(ds.id) is ds:
+                self._items.move_to_end(ds.id)  # it grew because it is in use
+                self._evict()
+
+    def _evict(self):
+        # The most recently used dataset always stays, even if it alone is over the budget
+        while len(self._items) > 1 and sum(d.nbytes for d in self._items.values()) > self.max_bytes:
+            self._items.popitem(last=False)
+
+    def get(self, dataset_id, owner=None):
+        if not isinstance(dataset_id, str):
+            return None
+        content_hash, _, signature = dataset_id.rpartition("-")
+        signed = bool(content_hash) and hmac.compare_digest(signature, self._signature(owner, content_hash))
+        with self._lock:
+            ds = self._items.get(dataset_id)
+            if ds is not None:
+                if owner is not None and ds.owner not in (None, owner):
+                    return None
+                self._items.move_to_end(ds.id)
+        if not signed:
+            return ds
+
+        from .cache import dataset_heads, parse_cache
+        head = dataset_heads.load(dataset_id) or {"content_hash": content_hash, "version": 0}
+        if ds is not None and ds.content_hash == head["content_hash"]:
+            return ds
+        # Not held here, or another worker appended to it since
+        cached = parse_cache.load(head["content_hash"])
+        if cached is None:
+            return None
+        frame, cost_col = cached
+        ds = Dataset(frame, cost_col, owner=owner, content_hash=head["content_hash"], dataset_id=dataset_id,
+                     version=head["version"])
+        self._insert(ds)
+        return ds
+
+    def stats(self):
+        with self._lock:
+            return {"datasets": len(self._items), "bytes": sum(d.nbytes for d in self._items.values()), "max_bytes": self.max_bytes,
+                    "per_user": self.per_user}
+
+
+registry = DatasetRegistry()
@@ -0,0 +1,405 @@
+# forecast.py
+# Monthly sales forecasts. Every series of a request (the filtered total, or one
+# per Category/Country/Product/...) is laid out on one shared month axis as a
+# row of a segments x months matrix, and all linear trends are fitted together
+# from their least-squares sums instead of one np.polyfit call per series.
+# Months without sales are gaps on the axis, not observations of zero: the
+# trend and mean are fitted over the months that have sales only.
+#
+# The matrix and sums of each (filters, by) view are kept per dataset as a
+# ForecastState. Rows appended for the latest month or later are folded into
+# it without rescanning the dataset; rows for earlier months discard it.
+#
+# Prediction intervals come from a residual bootstrap: each series' in-sample
+# errors are resampled into BOOTSTRAP_PATHS simulated paths for all series and
+# horizon steps at once, one (series, paths, horizon) array per chunk of series.
+# Methods whose errors do not compound over the horizon need no simulation:
+# their bootstrap quantiles are the quantiles of the errors themselves.
+
+import json, os, threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from .datasets import FILTER_COLUMNS, normalize_filters
+from .timeseries import build_rollups
+
+FORECAST_MAX_HORIZON = 12
+# Fewer months than this and a trend forecast falls back to the last value
+MIN_TREND_MONTHS = 3
+FORECAST_METHODS = ("trend", "naive", "seasonal_naive", "mean", "smooth")
+SEASON = 12
+SMOOTHING_ALPHA = float(os.environ.get("FORECAST_SMOOTHING_ALPHA", "0.3"))
+# Forecast states kept per dataset (one per filter spec and split column)
+FORECAST_STATE_LIMIT = int(os.environ.get("FORECAST_STATE_LIMIT", "32"))
+# Prediction interval levels (percent) and the bootstrap behind them
+PREDICTION_LEVELS = (80, 95)
+BOOTSTRAP_PATHS = int(os.environ.get("FORECAST_BOOTSTRAP_PATHS", "2000"))
+BOOTSTRAP_SEED = int(os.environ.get("FORECAST_BOOTSTRAP_SEED", "0"))
+# Simulated values per array chunk (series x paths x horizon), bounds memory
+BOOTSTRAP_CHUNK_VALUES = int(os.environ.get("FORECAST_BOOTSTRAP_CHUNK_VALUES", "4000000"))
+# Fewer in-sample errors than this and a series gets no interval
+MIN_RESIDUALS = 2
+
+
+def monthly_matrix(ds, filters=None, by=None):
+    """Monthly sales of the filtered view of `ds`, one row per value of column `by`.
+
+    Returns (months, segments, sales): the datetime64[M] axis running from the
+    first to the last dated month of the view, the segment values (sorted;
+    [None] without `by`), and a float array of shape (segments, months) with
+    zeros for months without sales. Rows without a valid date are ignored.
+    Read from the dataset's monthly time rollup unless `by` is a column the
+    rollup does not split on.
+    """
+    if by is None or by in FILTER_COLUMNS:
+        periods, segments, values = ds.derived("timeseries", build_rollups).series(filters, "month", by, ("sales",))
+        return periods.astype("datetime64[M]"), segments, values["sales"]
+
+    df, dates = ds.select(filters)
+    valid = dates.notna().to_numpy()
+    if not valid.any():
+        return np.array([], dtype="datetime64[M]"), [], np.zeros((0, 0))
+    months = dates.to_numpy()[valid].astype("datetime64[M]")
+    first = months.min()
+    n_months = int((months.max() - first).astype(np.int64)) + 1
+    col = (months - first).astype(np.int64)
+    sales = df["Selling Price"].to_numpy(dtype=float)[valid]
+    codes, uniques = pd.factorize(df[by].to_numpy()[valid], sort=True)
+    keep = codes >= 0  # rows with no segment value
+    segments = uniques.tolist()
+    # One pass: each row adds its sales to cell (segment, month)
+    matrix = np.bincount(codes[keep] * n_months + col[keep], weights=sales[keep], minlength=len(segments) * n_months)
+    return first + np.arange(n_months), segments, matrix.reshape(len(segments), n_months)
+
+
+def history_start(sales):
+    """Column of each row's first month with sales (its width when it has none)."""
+    active = sales != 0
+    if not sales.shape[1]:
+        return np.zeros(len(sales), dtype=np.int64)
+    return np.where(active.any(axis=1), active.argmax(axis=1), sales.shape[1])
+
+
+def window_sums(sales, lo=0):
+    """Least-squares sums (n, Σt, Σt², Σy, Σty) per row over the columns lo.. that have sales.
+
+    Empty months get weight 0. Shape (5, rows); sums over disjoint column
+    ranges add up.
+    """
+    t = np.arange(lo, sales.shape[1], dtype=float)
+    w = (sales[:, lo:] != 0).astype(float)
+    wy = w * sales[:, lo:]
+    return np.stack([w.sum(axis=1), w @ t, w @ (t * t), wy.sum(axis=1), wy @ t])
+
+
+def trend_lines(sums):
+    """Intercept and slope of y = a + b*t from window_sums (flat through the mean below two months)."""
+    n, st, stt, sy, sty = sums
+    denom = n * stt - st * st
+    with np.errstate(divide="ignore", invalid="ignore"):
+        b = np.where(denom > 0, (n * sty - st * sy) / denom, 0.0)
+        a = np.where(n > 0, (sy - b * st) / n, 0.0)
+    return a, b
+
+
+def smooth_levels(sales, start, lo=0, level=None, alpha=SMOOTHING_ALPHA):
+    """Exponential smoothing level after each column lo.. of `sales`, shape (rows, columns - lo).
+
+    `level` is the level after column lo - 1; a row's level starts at its
+    first month with sales and stays 0 before it.
+    """
+    level = np.zeros(len(sales)) if level is None else level
+    out = np.empty((len(sales), sales.shape[1] - lo))
+    for i, col in enumerate(range(lo, sales.shape[1])):
+        y = sales[:, col]
+        level = np.where(col > start, alpha * y + (1 - alpha) * level, np.where(col == start, y, level))
+        out[:, i] = level
+    return out
+
+
+def season_columns(last, horizon):
+    """Column one season before each of the `horizon` months after column `last`."""
+    steps = np.arange(1, horizon + 1)
+    return last + steps - SEASON * np.ceil(steps / SEASON).astype(np.int64)
+
+
+def residuals(sales, start, method):
+    """In-sample errors of `method` per row and month, NaN where it makes no forecast.
+
+    Trend and mean use the errors of their fit over the history; naive,
+    seasonal_naive and smooth the one-step errors against the previous month,
+    the month a season back and the previous smoothing level.
+    """
+    t = np.arange(sales.shape[1])
+    active = sales != 0  # the months trend and mean are fitted over
+    if method == "trend":
+        a, b = trend_lines(window_sums(sales))
+        errors = sales - (a[:, None] + b[:, None] * t)
+    elif method == "mean":
+        with np.errstate(divide="ignore", invalid="ignore"):
+            errors = sales - sales.sum(axis=1, keepdims=True) / active.sum(axis=1, keepdims=True)
+    elif method == "seasonal_naive":
+        errors = sales - np.concatenate([np.zeros((len(sales), SEASON)), sales[:, :-SEASON]], axis=1)[:, :sales.shape[1]]
+        active = t - SEASON >= start[:, None]
+    elif method == "smooth":
+        levels = smooth_levels(sales, start)
+        errors = sales - np.concatenate([np.zeros((len(sales), 1)), levels[:, :-1]], axis=1)
+        active = t > start[:, None]
+    else:
+        errors = np.diff(sales, axis=1, prepend=0.0)
+        active = t > start[:, None]
+    return np.where(active, errors, np.nan)
+
+
+def bootstrap_bands(points, errors, carry, levels=PREDICTION_LEVELS, paths=BOOTSTRAP_PATHS, seed=BOOTSTRAP_SEED):
+    """Lower and upper bounds around `points` (series, horizon) for each level.
+
+    Every path adds errors drawn with replacement from the series' own row of
+    `errors` (NaN entries skipped). Step h gets a fresh error plus `carry`
+    times the errors of the steps before it: 1 for a random walk (naive), the
+    smoothing weight for smooth, 0 when forecast errors do not compound.
+    Returns an array (levels, 2, series, horizon), NaN for series with fewer
+    than MIN_RESIDUALS errors.
+    """
+    n_series, horizon = points.shape
+    quantiles = np.array([q for level in levels for q in ((100 - level) / 2, (100 + level) / 2)])
+    bands = np.full((len(quantiles), n_series, horizon), np.nan)
+    # Each row's errors sorted to its front (NaNs sort last)
+    pool = np.sort(errors, axis=1)
+    count = np.isfinite(pool).sum(axis=1)
+    ok = count >= MIN_RESIDUALS
+
+    # A single draw follows the errors' empirical distribution, so for rows whose
+    # errors do not compound the bootstrap quantiles are order statistics of the
+    # sorted errors (the limit of infinitely many paths), no simulation needed
+    direct = np.flatnonzero(ok & (carry == 0))
+    if len(direct):
+        rank = np.ceil(quantiles[None, :] / 100 * count[direct, None]).astype(np.int64) - 1
+        shift = np.take_along_axis(pool[direct], np.clip(rank, 0, count[direct, None] - 1), axis=1)
+        bands[:, direct] = np.maximum(points[direct][None] + shift.T[:, :, None], 0.0)
+
+    # Compounding errors: simulate `paths` paths per row, float32 to halve the
+    # memory traffic, and read the same order statistics off the sorted paths
+    simulated = np.flatnonzero(ok & (carry != 0))
+    rng = np.random.default_rng(seed)
+    rank = np.clip(np.ceil(quantiles / 100 * paths).astype(np.int64) - 1, 0, paths - 1)
+    step = max(1, BOOTSTRAP_CHUNK_VALUES // (paths * horizon))
+    for i in range(0, len(simulated), step):
+        rows = simulated[i:i + step]
+        picks = (rng.random((len(rows), horizon, paths), dtype=np.float32)
+                 * count[rows, None, None].astype(np.float32)).astype(np.intp)
+        draws = np.take_along_axis(pool[rows].astype(np.float32), picks.reshape(len(rows), -1), axis=1)
+        draws = draws.reshape(len(rows), horizon, paths)
+        shocks = draws + carry[rows, None, None].astype(np.float32) * (np.cumsum(draws, axis=1) - draws)
+        sims = np.sort(np.maximum(points[rows, :, None].astype(np.float32) + shocks, 0.0), axis=2)
+        bands[:, rows] = sims[:, :, rank].transpose(2, 0, 1)
+    return bands.reshape(len(levels), 2, n_series, horizon)
+
+
+class ForecastState:
+    """Monthly sales matrix of one (filters, by) view plus the running state its
+    forecasts are computed from: least-squares sums for the trend, smoothing
+    levels, and the matrix itself for naive and seasonal forecasts.
+    """
+
+    def __init__(self, ds, filters=None, by=None):
+        self.filters = normalize_filters(filters)
+        self.by = by
+        self.months, self.segments, self.sales = monthly_matrix(ds, self.filters, by)
+        self._index = {s: i for i, s in enumerate(self.segments)}
+        self._lock = threading.RLock()
+        self.start = history_start(self.sales)
+        self.sums = window_sums(self.sales)
+        levels = smooth_levels(self.sales, self.start)
+        self.level = levels[:, -1] if levels.shape[1] else np.zeros(len(self.segments))
+        self.level_prev = levels[:, -2] if levels.shape[1] > 1 else np.zeros(len(self.segments))
+
+    def append_rows(self, rows, dates):
+        """Fold newly appended dataset rows into the state.
+
+        Only the latest month and later months can change, so the work is
+        proportional to the segments times those few months, not to the
+        history. Returns False (the state is stale) when a row falls in an
+        earlier month.
+        """
+        keep = dates.notna().to_numpy()
+        for dim, values in self.filters.items():
+            keep &= rows[dim].isin(values).to_numpy()
+        if not keep.any():
+            return True
+        if not len(self.months):
+            return False
+        months = dates.to_numpy()[keep].astype("datetime64[M]")
+        if months.min() < self.months[-1]:
+            return False
+        sales = rows["Selling Price"].to_numpy(dtype=float)[keep]
+
+        with self._lock:
+            if self.by is None:
+                codes = np.zeros(len(sales), dtype=np.int64)
+            else:
+                values = rows[self.by].to_numpy()[keep]
+                named = pd.notna(values)
+                values, months, sales = values[named], months[named], sales[named]
+                if not len(values):
+                    return True
+                for value in pd.unique(values):
+                    if value not in self._index:
+                        self._add_segment(value)
+                codes = np.array([self._index[v] for v in values], dtype=np.int64)
+
+            lo = len(self.months) - 1  # the latest month, the only one that may already hold sales
+            extra = int((months.max() - self.months[-1]).astype(np.int64))
+            self.sums -= window_sums(self.sales[:, :lo + 1], lo)
+            if extra:
+                self.sales = np.concatenate([self.sales, np.zeros((len(self.segments), extra))], axis=1)
+                self.months = self.months[0] + np.arange(len(self.months) + extra)
+            np.add.at(self.sales, (codes, lo + (months - self.months[lo]).astype(np.int64)), sales)
+            self.start = np.where(self.start >= lo, lo + history_start(self.sales[:, lo:]), self.start)
+            self.sums += window_sums(self.sales, lo)
+            levels = smooth_levels(self.sales, self.start, lo, self.level_prev)
+            self.level = levels[:, -1]
+            if levels.shape[1] > 1:
+                self.level_prev = levels[:, -2]
+        return True
+
+    def _add_segment(self, value):
+        self._index[value] = len(self.segments)
+        self.segments.append(value)
+        self.sales = np.vstack([self.sales, np.zeros((1, self.sales.shape[1]))])
+        self.start = np.append(self.start, self.sales.shape[1])
+        self.sums = np.hstack([self.sums, np.zeros((5, 1))])
+        self.level = np.append(self.level, 0.0)
+        self.level_prev = np.append(self.level_prev, 0.0)
+
+    def project(self, horizon, method="trend"):
+        """Point forecasts for the `horizon` months after the axis, one row per segment.
+
+        Returns (forecasts, months of history, mask of rows that used
+        `method`). Rows the method cannot serve (a trend needs
+        MIN_TREND_MONTHS months, seasonal_naive a month one season back)
+        repeat their last month; values never go below zero.
+        """
+        if method not in FORECAST_METHODS:
+            raise ValueError(f"Unknown forecast method '{method}'.")
+        with self._lock:
+            n_series, n_months = self.sales.shape
+            n = self.sums[0]
+            last = self.sales[:, -1] if n_months else np.zeros(n_series)
+            usable = np.broadcast_to((n >= 1)[:, None], (n_series, horizon))
+            if method == "trend":
+                a, b = trend_lines(self.sums)
+                values = a[:, None] + b[:, None] * np.arange(n_months, n_months + horizon, dtype=float)
+                usable = np.broadcast_to((n >= MIN_TREND_MONTHS)[:, None], values.shape)
+            elif method == "mean":
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    values = np.repeat((self.sums[3] / n)[:, None], horizon, axis=1)
+            elif method == "smooth":
+                values = np.repeat(self.level[:, None], horizon, axis=1)
+            elif method == "seasonal_naive":
+                cols = season_columns(n_months - 1, horizon)
+                values = self.sales[:, np.clip(cols, 0, None)]
+                usable = cols[None, :] >= self.start[:, None]
+            else:
+                values = np.repeat(last[:, None], horizon, axis=1)
+            values = np.where(usable & np.isfinite(values), values, last[:, None])
+            return np.maximum(values, 0.0), n.astype(np.int64), usable.all(axis=1)
+
+    def intervals(self, values, method, used, levels=PREDICTION_LEVELS):
+        """Bootstrap bands (see bootstrap_bands) around the forecasts `values` of project().
+
+        Rows that fell back to the naive forecast (`used` False) resample naive errors.
+        """
+        with self._lock:
+            errors = residuals(self.sales, self.start, method)
+            carry = np.full(len(errors), {"naive": 1.0, "smooth": SMOOTHING_ALPHA}.get(method, 0.0))
+            if not used.all():
+                errors[~used] = residuals(self.sales[~used], self.start[~used], "naive")
+                carry[~used] = 1.0
+        return bootstrap_bands(values, errors, carry, levels)
+
+
+class ForecastStates:
+    """Least-recently-used ForecastStates of one dataset, keyed by filters and split column."""
+
+    def __init__(self, limit=FORECAST_STATE_LIMIT):
+        self.limit = max(1, limit)
+        self._states = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ds, filters=None, by=None):
+        spec = normalize_filters(filters)
+        key = (json.dumps({dim: sorted(map(str, values)) for dim, values in spec.items()}, sort_keys=True), by)
+        with self._lock:
+            state = self._states.get(key)
+            if state is not None:
+                self._states.move_to_end(key)
+                return state
+        while True:
+            # Built outside the lock; a state built while rows were appended may
+            # have missed append_rows(), so it is rebuilt rather than kept
+            version = ds.version
+            state = ForecastState(ds, spec, by)
+            with self._lock:
+                if key in self._states:  # built meanwhile by another caller
+                    return self._states[key]
+                if ds.version == version:
+                    self._states[key] = state
+                    while len(self._states) > self.limit:
+                        self._states.popitem(last=False)
+                    return state
+
+    def append_rows(self, rows, dates):
+        with self._lock:
+            self._states = OrderedDict((k, s) for k, s in self._states.items() if s.append_rows(rows, dates))
+        return True
+
+
+def _check_levels(levels):
+    try:
+        levels = [int(level) for level in ([levels] if isinstance(levels, str) else levels)]
+    except (TypeError, ValueError):
+        levels = [0]
+    if any(not 0 < level < 100 for level in levels):
+        raise ValueError("Prediction interval levels must be integers between 0 and 100.")
+    return sorted(set(levels))
+
+
+def forecast_segments(ds, filters=None, by=None, horizon=3, method="trend", levels=PREDICTION_LEVELS):
+    """History and forecast of every `by` segment (or the filtered total) in one fit.
+
+    Returns {"by", "method", "periods", "forecast_periods", "series":
+    [{"segment", "history", "forecast", "intervals", "next_month", "method", "note"}, ...]}
+    with periods as "YYYY-MM" strings and values aligned to them. "intervals"
+    maps each level ("80", "95") to {"lower", "upper"} lists, or is None when
+    the segment has too little history; pass `levels=()` to skip them.
+    """
+    horizon = min(max(int(horizon), 1), FORECAST_MAX_HORIZON)
+    levels = _check_levels(levels)
+    state = ds.derived("forecast", lambda d: ForecastStates()).get(ds, filters, by)
+    with state._lock:  # one consistent snapshot while rows may be appended
+        values, n, used = state.project(horizon, method)
+        bands = state.intervals(values, method, used, levels) if levels and len(state.months) else None
+        months, segments, sales = state.months, list(state.segments), state.sales.tolist()
+    result = {"by": by, "method": method, "periods": [str(m) for m in months], "forecast_periods": [], "series": []}
+    if not len(months):
+        return result
+
+    result["forecast_periods"] = [str(m) for m in months[-1] + np.arange(1, horizon + 1)]
+    for i, (segment, history, fvals) in enumerate(zip(segments, sales, values.tolist())):
+        intervals = None
+        if bands is not None and np.isfinite(bands[0, 0, i, 0]):
+            intervals = {str(level): {"lower": bands[j, 0, i].tolist(), "upper": bands[j, 1, i].tolist()}
+                         for j, level in enumerate(levels)}
+        result["series"].append({
+            "segment": segment,
+            "history": history,
+            "forecast": fvals,
+            "intervals": intervals,
+            "next_month": round(fvals[0], 2),
+            "method": method if used[i] else "naive",
+            "note": "" if n[i] >= MIN_TREND_MONTHS else "Very little history. Forecast may be naive.",
+        })
+    return result
@@ -0,0 +1,120 @@
+# ingest.py
+# Chunked readers for dashboard uploads. Each reader yields raw DataFrames of at
+# most `chunk_rows` rows so the caller can clean/derive a chunk before the next
+# one is parsed, keeping peak memory tied to the chunk size, not the file size.
+# prepare_dataframe then turns a raw chunk into the dashboard's column layout.
+
+import os
+import numpy as np
+import pandas as pd
+
+CHUNK_ROWS = int(os.environ.get("UPLOAD_CHUNK_ROWS", "50000"))
+
+
+def upload_format(file):
+    """"csv" or "xlsx", by the name of an upload (or an open local file); anything else is read as xlsx."""
+    name = (getattr(file, "filename", "") or getattr(file, "name", "") or "").lower()
+    return "csv" if name.endswith(".csv") else "xlsx"
+
+
+def iter_upload_chunks(file, chunk_rows=CHUNK_ROWS):
+    """Yield raw DataFrame chunks from an uploaded .xlsx or .csv file (or an open local file)."""
+    stream = getattr(file, "stream", file)
+    if upload_format(file) == "csv":
+        return _iter_csv_chunks(stream, chunk_rows)
+    return _iter_xlsx_chunks(stream, chunk_rows)
+
+
+def _iter_csv_chunks(stream, chunk_rows):
+    with pd.read_csv(stream, chunksize=chunk_rows) as reader:
+        yield from reader
+
+
+def _iter_xlsx_chunks(stream, chunk_rows):
+    from openpyxl import load_workbook
+
+    wb = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            yield pd.DataFrame()
+            return
+        columns = [str(h) if h is not None else f"Unnamed: {i}" for i, h in enumerate(header)]
+        width = len(columns)
+
+        buf, yielded = [], False
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            if len(row) != width:
+                row = tuple(row[:width]) + (None,) * (width - len(row))
+            buf.append(row)
+            if len(buf) >= chunk_rows:
+                yield pd.DataFrame(buf, columns=columns)
+                buf, yielded = [], True
+        if buf or not yielded:
+            yield pd.DataFrame(buf, columns=columns)
+    finally:
+        wb.close()
+
+
+# Age group upper bounds (inclusive) and labels; the last label is for missing/non-numeric ages
+AGE_BOUNDS = np.array([18, 25, 40, 60], dtype=float)
+AGE_LABELS = np.array(["Teen", "Youth", "Adult", "Middle", "Senior", "Unknown"], dtype=object)
+MONTH_ABBR = np.array(["", "Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"], dtype=object)
+
+
+def _age_groups(ages):
+    a = pd.to_numeric(ages, errors="coerce").to_numpy(dtype=float)
+    idx = np.searchsorted(AGE_BOUNDS, a, side="left")
+    idx[np.isnan(a)] = len(AGE_LABELS) - 1
+    return AGE_LABELS[idx]
+
+
+def _month_abbr(dates):
+    months = dates.dt.month.to_numpy(dtype=float, na_value=0)
+    return MONTH_ABBR[months.astype(np.int64)]
+
+
+def _iso_dates(dates):
+    # Format each distinct day once; uploads repeat the same dates many times
+    days = dates.to_numpy(dtype="datetime64[D]").view("i8")
+    codes, uniques = pd.factorize(days)
+    return uniques.view("datetime64[D]").astype(str).astype(object)[codes]
+
+
+def prepare_dataframe(df):
+    # Accept 'Purchase Amount' or common typo 'Purschase Amount'
+    cost_col = "Purchase Amount" if "Purchase Amount" in df.columns else ("Purschase Amount" if "Purschase Amount" in df.columns else None)
+    if cost_col is None:
+        raise ValueError("Excel must include 'Purchase Amount' (or the common typo 'Purschase Amount').")
+
+    keep = ["Customer Name","Age","Country","Product","Purchase Date",cost_col,"Payment Mode","Category","Selling Price"]
+    for c in keep:
+        if c not in df.columns:
+            df[c] = None
+    out = df[keep].copy()
+
+    out["Selling Price"] = pd.to_numeric(out["Selling Price"], errors="coerce").fillna(0)
+    out[cost_col] = pd.to_numeric(out[cost_col], errors="coerce").fillna(0)
+
+    # Derived columns (dates are parsed once and reused for every date-based field)
+    # "mixed": each value is parsed on its own, as a per-row pd.to_datetime would;
+    # an inferred column format would turn dates written any other way into NaT
+    dates = pd.to_datetime(out["Purchase Date"], errors="coerce", format="mixed")
+    out["__Profit"] = out["Selling Price"].to_numpy() - out[cost_col].to_numpy()
+    out["__Age Group"] = _age_groups(out["Age"])
+    out["__Month"] = _month_abbr(dates)
+    out["Purchase Date"] = _iso_dates(dates)
+    return out, cost_col
+
+
+def load_upload(file):
+    """Read an upload chunk by chunk, preparing each chunk as soon as it is parsed."""
+    parts, cost_col = [], None
+    for chunk in iter_upload_chunks(file):
+        part, cost_col = prepare_dataframe(chunk)
+        parts.append(part)
+    df = parts[0] if len(parts) == 1 else pd.concat(parts, ignore_index=True)
+    return df, cost_col
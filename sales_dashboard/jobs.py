@@ -0,0 +1,224 @@
+# jobs.py
+# Background queue for long-running exports (PDF reports). Submitting returns a
+# job id straight away; a fixed pool of worker threads drains a bounded queue,
+# and each job's state lives in a status file next to its artifact, so any web
+# worker process can answer status and download requests. Jobs are deleted
+# once they are older than the retention period.
+
+import json, os, queue, tempfile, threading, time, uuid
+from datetime import datetime
+
+from .cache import CACHE_ROOT, report_cache
+
+REPORT_WORKERS = max(1, int(os.environ.get("REPORT_WORKERS", "2")))
+# Jobs waiting to start (per web worker); submissions beyond this are rejected
+REPORT_QUEUE_SIZE = int(os.environ.get("REPORT_QUEUE_SIZE", "16"))
+REPORT_RETENTION_SECONDS = int(os.environ.get("REPORT_RETENTION_SECONDS", "3600"))
+
+REPORT_STAGES = ("aggregate", "charts", "layout")
+# "preview" ends the report with the first 200 rows; "full" streams every filtered row
+REPORT_APPENDIX_MODES = ("preview", "full")
+DEFAULT_REPORT_APPENDIX = os.environ.get("REPORT_APPENDIX", "preview")
+# Most reports one split request may burst into (one per distinct value)
+REPORT_BURST_MAX_SEGMENTS = int(os.environ.get("REPORT_BURST_MAX_SEGMENTS", "50"))
+
+
+class QueueFull(Exception):
+    pass
+
+
+# ---- Report artifacts ----
+def _cached_artifact(key, ext, build):
+    """Bytes of a report artifact, reusing the stored file when `key` was rendered before."""
+    path = report_cache.lookup(key, exts=(ext,)) if key else None
+    if path is not None:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            pass
+    data = build()
+    if key:
+        def write(p):
+            with open(p, "wb") as f:
+                f.write(data)
+        report_cache.store(key, write, ext=ext)
+    return data
+
+
+def render_report(ds, filters, key, options, progress=None):
+    def build():
+        from .report import build_report
+        return build_report(ds, filters, progress, **options)
+    return _cached_artifact(key, ".pdf", build)
+
+
+def render_burst(ds, filters, split_by, key, options, progress=None):
+    """ZIP of one report per `split_by` value of the filtered view."""
+    def build():
+        from .report import burst_reports, zip_reports
+        generated_at = datetime.now()
+        reports = burst_reports(ds, split_by, filters, progress, generated_at=generated_at, **options)
+        return zip_reports(reports, split_by, generated_at)
+    return _cached_artifact(key, ".zip", build)
+
+
+# ---- Jobs ----
+class Job:
+    """A job as recorded in its status file."""
+
+    def __init__(self, job_id, owner=None, stages=(), filename="report.pdf", etag=None, state="queued",
+                 stage=None, error=None, path=None, created=None, finished=None):
+        self.id = job_id
+        self.owner = owner
+        self.stages = tuple(stages)
+        self.filename = filename
+        self.etag = etag
+        self.state = state
+        self.stage = stage
+        self.error = error
+        self.path = path
+        self.created = created or time.time()
+        self.finished = finished
+
+    def record(self):
+        return {"owner": self.owner, "stages": list(self.stages), "filename": self.filename, "etag": self.etag,
+                "state": self.state, "stage": self.stage, "error": self.error, "path": self.path,
+                "created": self.created, "finished": self.finished}
+
+    def status(self):
+        if self.state == "done":
+            progress = 1.0
+        elif self.stage in self.stages:
+            progress = self.stages.index(self.stage) / len(self.stages)
+        else:
+            progress = 0.0
+        return {
+            "job_id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "stages": list(self.stages),
+            "progress": round(progress, 2),
+            "error": self.error,
+            "filename": self.filename,
+        }
+
+
+def _status_path(directory, job_id):
+    return os.path.join(directory, job_id + ".json")
+
+
+def _save(directory, job):
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(job.record(), f)
+    os.replace(tmp, _status_path(directory, job.id))
+
+
+def _load(directory, job_id):
+    try:
+        with open(_status_path(directory, job_id), encoding="utf-8") as f:
+            return Job(job_id, **json.load(f))
+    except (OSError, ValueError, TypeError):
+        return None
+
+
+class JobQueue:
+    """Bounded job queue drained by `workers` daemon threads.
+
+    A job is a callable taking a `progress(stage)` callback and returning the
+    artifact bytes; a ValueError it raises becomes the job's error message.
+    Jobs only coordinate: rasterizing and page layout run in the renderer
+    pool's processes (see charts.run_in_pool).
+    """
+
+    def __init__(self, directory, workers=REPORT_WORKERS, max_pending=REPORT_QUEUE_SIZE,
+                 retention=REPORT_RETENTION_SECONDS):
+        self.directory = directory
+        self.workers = workers
+        self.retention = retention
+        self._queue = queue.Queue(max_pending)
+        self._lock = threading.Lock()
+        self._threads = []
+        self._cleaned = 0.0
+        os.makedirs(directory, exist_ok=True)
+
+    def _start(self):
+        # Started on first use, so importing the module spawns nothing
+        with self._lock:
+            while len(self._threads) < self.workers:
+                t = threading.Thread(target=self._work, name=f"report-worker-{len(self._threads)}", daemon=True)
+                t.start()
+                self._threads.append(t)
+
+    def submit(self, fn, owner=None, stages=(), filename="report.pdf", etag=None):
+        self.cleanup()
+        self._start()
+        job = Job(uuid.uuid4().hex, owner, stages, filename, etag)
+        _save(self.directory, job)
+        try:
+            self._queue.put_nowait((job, fn))
+        except queue.Full:
+            os.remove(_status_path(self.directory, job.id))
+            raise QueueFull("Too many reports are being generated. Please try again shortly.")
+        return job
+
+    def get(self, job_id, owner=None):
+        self.cleanup()
+        if not isinstance(job_id, str) or not job_id.isalnum():
+            return None
+        job = _load(self.directory, job_id)
+        if job is None or (owner is not None and job.owner not in (None, owner)):
+            return None
+        return job
+
+    def _work(self):
+        while True:
+            job, fn = self._queue.get()
+            def progress(stage):
+                job.stage = stage
+                _save(self.directory, job)
+            job.state = "running"
+            _save(self.directory, job)
+            try:
+                data = fn(progress)
+                path = os.path.join(self.directory, job.id)
+                with open(path, "wb") as f:
+                    f.write(data)
+                job.path = path
+                job.state = "done"
+            except ValueError as e:
+                job.error = str(e)
+                job.state = "failed"
+            except Exception as e:
+                print("Report Error:", e)
+                job.error = "Report generation failed."
+                job.state = "failed"
+            finally:
+                job.finished = time.time()
+                _save(self.directory, job)
+                self._queue.task_done()
+
+    def cleanup(self):
+        """Delete status files and artifacts untouched for the retention period."""
+        now = time.time()
+        with self._lock:
+            if now - self._cleaned < 60:
+                return
+            self._cleaned = now
+        # Status files are rewritten at every stage, so only finished (or abandoned) jobs age out
+        cutoff = now - self.retention
+        for entry in os.scandir(self.directory):
+            try:
+                if entry.is_file() and entry.stat().st_mtime < cutoff:
+                    os.remove(entry.path)
+            except OSError:
+                pass
+
+    def stats(self):
+        jobs = (_load(self.directory, e.name[:-5]) for e in os.scandir(self.directory) if e.name.endswith(".json"))
+        states = [j.state for j in jobs if j is not None]
+        return {s: states.count(s) for s in ("queued", "running", "done", "failed")}
+
+
+report_jobs = JobQueue(os.path.join(CACHE_ROOT, "reports"))
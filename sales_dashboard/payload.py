@@ -0,0 +1,48 @@
+# payload.py
+# Compact columnar encoding of a prepared frame for the dashboard page.
+#
+# {"length": n, "columns": {name: column, ...}} where each column is one of
+#   {"type": "num",  "data": <base64 little-endian float64>}              (NaN = missing)
+#   {"type": "dict", "dtype": "u1|u2|u4", "codes": <base64>, "values": [...]}  (code 0 = missing,
+#                                                                          code k = values[k-1])
+#   {"type": "str",  "values": [...]}                                      (high-cardinality text)
+
+import base64, json
+
+import numpy as np
+import pandas as pd
+
+# Text columns whose distinct values exceed this share of rows are sent as plain lists
+DICT_MAX_RATIO = 0.5
+
+
+def _b64(arr):
+    return base64.b64encode(np.ascontiguousarray(arr).tobytes()).decode("ascii")
+
+
+def _code_dtype(n_values):
+    if n_values < 2 ** 8:
+        return "u1", np.dtype("<u1")
+    if n_values < 2 ** 16:
+        return "u2", np.dtype("<u2")
+    return "u4", np.dtype("<u4")
+
+
+def encode_column(series):
+    if pd.api.types.is_numeric_dtype(series) and not pd.api.types.is_bool_dtype(series):
+        return {"type": "num", "data": _b64(series.to_numpy(dtype="<f8", na_value=np.nan))}
+
+    codes, uniques = pd.factorize(series, use_na_sentinel=True)
+    if len(series) and len(uniques) > DICT_MAX_RATIO * len(series):
+        return {"type": "str", "values": series.astype(object).where(series.notna(), None).tolist()}
+    name, dtype = _code_dtype(len(uniques) + 1)
+    return {"type": "dict", "dtype": name, "codes": _b64((codes + 1).astype(dtype)), "values": uniques.tolist()}
+
+
+def columnar_payload(frame):
+    """Encode every column of `frame`; returns the UTF-8 JSON body."""
+    body = {
+        "length": len(frame),
+        "columns": {col: encode_column(frame[col]) for col in frame.columns},
+    }
+    return json.dumps(body, default=str, separators=(",", ":")).encode("utf-8")
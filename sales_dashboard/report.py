@@ -0,0 +1,486 @@
+# report.py
+# PDF sales report (no matplotlib): KPI cover page, one page per chart with an
+# insight box, an executive summary and a data preview table. Imports reportlab
+# (and plotly for the "kaleido" chart renderer), so the web app only imports
+# this module when a report is requested.
+
+import io, re, textwrap, zipfile, zlib
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Drawing
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.rl_accel import escapePDF
+from reportlab.lib.units import mm
+from reportlab.lib.utils import ImageReader
+from reportlab.pdfbase.pdfdoc import PDFName, PDFStream
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+from .charts import CHART_RENDERERS, DEFAULT_CHART_RENDERER, render_pngs, run_in_pool
+from .datasets import FILTER_COLUMNS, normalize_filters
+from .jobs import DEFAULT_REPORT_APPENDIX, REPORT_APPENDIX_MODES, REPORT_BURST_MAX_SEGMENTS
+from .summary import summarize
+from .vector_charts import draw_chart
+
+PAGE_W, PAGE_H = A4
+MARGIN = 20 * mm
+USABLE_W = PAGE_W - 2 * MARGIN
+TABLE_FONT_SIZE = 8
+TABLE_ROW_HEIGHT = 18  # what reportlab's Table gives a one-line row at font size 8
+PREVIEW_COLUMNS = ["Customer Name", "Product", "Category", "Country", "Selling Price", "__Profit"]
+
+
+def _plotly_figure(kind, frame, x, y, title, color):
+    import plotly.express as px
+    if kind == "bar":
+        fig = px.bar(frame, x=x, y=y, template="plotly_white", title=title, color_discrete_sequence=[color])
+    elif kind == "line":
+        fig = px.line(frame, x=x, y=y, markers=True, template="plotly_white", title=title,
+                      color_discrete_sequence=[color])
+    else:
+        fig = px.pie(frame, names=x, values=y, template="plotly_white", title=title,
+                     color_discrete_sequence=px.colors.qualitative.Pastel)
+    margin = dict(l=20, r=20, t=60, b=40) if kind == "pie" else dict(l=30, r=30, t=60, b=40)
+    fig.update_layout(margin=margin, title_x=0.5, height=500, width=1000)
+    return fig
+
+
+def iter_row_pages(frame, rows_per_page):
+    """Yield the rows of `frame` as lists of display strings, one page at a time."""
+    for start in range(0, len(frame), rows_per_page):
+        yield frame.iloc[start:start + rows_per_page].astype(str).values.tolist()
+
+
+def draw_table_page(c, x, top, col_widths, header, rows, row_h=TABLE_ROW_HEIGHT):
+    """Draw a header row plus `rows` below `top`, styled like the preview Table."""
+    width = sum(col_widths)
+    n = len(rows) + 1
+    baseline = top - row_h + (row_h - TABLE_FONT_SIZE) / 2 + 1
+
+    c.setFillColor(colors.HexColor("#1565C0"))
+    c.rect(x, top - row_h, width, row_h, stroke=0, fill=1)
+    c.setFillColor(colors.whitesmoke)
+    for i in range(0, len(rows), 2):
+        c.rect(x, top - (i + 2) * row_h, width, row_h, stroke=0, fill=1)
+
+    xs = [x]
+    for w in col_widths:
+        xs.append(xs[-1] + w)
+    c.setFont("Helvetica", TABLE_FONT_SIZE)
+    c.setFillColor(colors.whitesmoke)
+    for j, label in enumerate(header):
+        c.drawString(xs[j] + 3, baseline, label)
+
+    # Body text is written as raw PDF text operators: one Tm per column, then a
+    # T* (next line, leading = row height) per cell. Encoding/escaping matches
+    # what reportlab does for its standard Type 1 fonts.
+    font = c._doc.getInternalFontName("Helvetica")
+    ops = [f"BT {font} {TABLE_FONT_SIZE} Tf {row_h} TL 0 g"]
+    for j in range(len(header)):
+        ops.append(f"1 0 0 1 {xs[j] + 3:.2f} {baseline - row_h:.2f} Tm")
+        for i, row in enumerate(rows):
+            cell = escapePDF(row[j].encode("cp1252", "replace"))
+            ops.append(f"({cell}) Tj" if i == 0 else f"T* ({cell}) Tj")
+    ops.append("ET")
+    c.addLiteral("\n".join(ops))
+
+    c.setStrokeColor(colors.grey)
+    c.setLineWidth(0.3)
+    c.grid(xs, [top - i * row_h for i in range(n + 1)])
+
+
+def compress_last_page(c):
+    """Deflate the page just closed by showPage() right away.
+
+    reportlab keeps every page's content stream as plain text until save();
+    over thousands of appendix pages that, not the rows, is what grows memory.
+    """
+    page = c._doc.Pages.pages[-1]
+    if page.Contents or not page.stream:
+        return
+    stream = PDFStream(content=zlib.compress(page.stream.encode("utf8")))
+    stream.dictionary["Filter"] = PDFName("FlateDecode")
+    page.Contents, page.stream = stream, None
+
+
+def build_report(ds, filters=None, progress=None, renderer=DEFAULT_CHART_RENDERER,
+                 appendix=DEFAULT_REPORT_APPENDIX, generated_at=None):
+    """Render the PDF report for a filtered view of `ds` and return its bytes.
+
+    `progress(stage)` is called as the report enters each of jobs.REPORT_STAGES.
+    `renderer` is "kaleido" (PNG charts) or "vector" (reportlab drawings).
+    `appendix` is "preview" (first 200 rows) or "full" (every filtered row,
+    streamed one page at a time). `generated_at` (default: now) is the only
+    time printed in the report; the PDF itself is built with reportlab's
+    invariant mode, so the same inputs and time give byte-identical output.
+    Raises ValueError when the view has no rows or an option is unknown.
+    """
+    _check_options(renderer, appendix)
+    progress = progress or (lambda stage: None)
+
+    progress("aggregate")
+    df, _ = ds.select(filters)
+    if df.empty:
+        raise ValueError("No data to generate PDF.")
+    summary = summarize(ds, filters, count_customers=False)
+
+    progress("charts")
+    pngs = _render_charts([summary], renderer)[0]
+
+    progress("layout")
+    return run_in_pool(_layout_report, [(summary, _table_rows(df, appendix), pngs, appendix, generated_at)])[0]
+
+
+def _check_options(renderer, appendix):
+    if renderer not in CHART_RENDERERS:
+        raise ValueError(f"Unknown chart renderer '{renderer}'.")
+    if appendix not in REPORT_APPENDIX_MODES:
+        raise ValueError(f"Unknown appendix mode '{appendix}'.")
+
+
+def _chart_series(summary):
+    """(kind, x, y, labels, values, color, title, note, extra) for each chart page."""
+    series = []
+    if summary.category_profit:
+        series.append(("bar", "Category", "__Profit", *zip(*summary.category_profit), "#1565C0",
+                       "Category vs Profit",
+                       "Shows which product categories generate the highest overall profit.",
+                       f"The '{summary.top_category}' category achieved the maximum profit. Consider increasing inventory, promotions, or similar SKUs."))
+    if summary.month_sales:
+        series.append(("line", "Month", "Selling Price", *zip(*summary.month_sales), "#43A047",
+                       "Monthly Sales Trend",
+                       "Visualizes monthly fluctuations in total sales.",
+                       f"Peak sales observed in {summary.peak_month}. Lowest sales observed in {summary.low_month}. Consider seasonal promotions and inventory planning."))
+    if summary.country_sales:
+        country, sales = summary.top_sales_country
+        series.append(("pie", "Country", "Selling Price", *zip(*summary.country_sales), None,
+                       "Country-wise Sales Share",
+                       "Displays contribution of each country to total revenue.",
+                       f"{country} contributes the highest share (₹{int(sales):,}). Consider localised campaigns in other markets to diversify."))
+    return series
+
+
+def _render_charts(summaries, renderer):
+    """Chart PNGs (None where rendering failed) for each report summary; None per summary for "vector".
+
+    With the "kaleido" renderer the figures of every report go to the render
+    pool as one batch, so several reports share its workers.
+    """
+    series = [_chart_series(summary) for summary in summaries]
+    if renderer == "vector":
+        return [None] * len(summaries)
+    figures = [_plotly_figure(kind, pd.DataFrame({x: list(labels), y: list(values)}), x, y, title, color)
+               for pages in series for kind, x, y, labels, values, color, title, note, extra in pages]
+    pngs = iter(render_pngs(figures))
+    return [[next(pngs) for _ in pages] for pages in series]
+
+
+def _chart_pages(summary, pngs):
+    """Chart pages (image or Drawing, title, note, extra); drawn as vectors when `pngs` is None."""
+    pages = []
+    for i, (kind, x, y, labels, values, color, title, note, extra) in enumerate(_chart_series(summary)):
+        if pngs is None:
+            img = draw_chart(kind, list(labels), list(values), title, color, USABLE_W, USABLE_W / 2)
+        elif pngs[i] is not None:
+            img = ImageReader(io.BytesIO(pngs[i]))
+        else:
+            continue
+        pages.append((img, title, note, extra))
+    return pages
+
+
+def _table_rows(df, appendix):
+    """The data table columns of `df` (first 200 rows unless the appendix is "full")."""
+    rows = df.reindex(columns=PREVIEW_COLUMNS, fill_value="")
+    return rows if appendix == "full" else rows.head(200)
+
+
+def _layout_report(summary, table_rows, pngs, appendix, generated_at):
+    # Runs in a renderer pool process: everything it is given is picklable
+    return _draw_report(summary, table_rows, _chart_pages(summary, pngs), appendix, generated_at)
+
+
+def _draw_report(summary, df, charts, appendix, generated_at=None):
+    """Lay out the report pages for `summary` (with `df` as the data table) and return the PDF bytes."""
+    now_str = (generated_at or datetime.now()).strftime("%d %b %Y, %I:%M %p")
+    usable_w = USABLE_W
+
+    # ---------- PDF Creation ----------
+    pdf_buffer = io.BytesIO()
+    c = canvas.Canvas(pdf_buffer, pagesize=A4, invariant=1)
+
+    def draw_header(title=None):
+        c.setFillColor(colors.HexColor("#1565C0"))
+        c.rect(0, PAGE_H - 18 * mm, PAGE_W, 18 * mm, stroke=0, fill=1)
+        if title:
+            c.setFont("Helvetica-Bold", 14)
+            c.setFillColor(colors.white)
+            c.drawString(MARGIN, PAGE_H - 13 * mm, title)
+
+    def draw_footer(page_num):
+        c.setFont("Helvetica", 8)
+        c.setFillColor(colors.grey)
+        footer_text = f"Generated by Sales Dashboard — {now_str}"
+        c.drawString(MARGIN, 10 * mm, footer_text)
+        c.drawRightString(PAGE_W - MARGIN, 10 * mm, f"Page {page_num}")
+
+    # ---------- Cover Page ----------
+    page_num = 1
+    draw_header("Sales Performance Report")
+    c.setFont("Helvetica-Bold", 24)
+    c.setFillColor(colors.HexColor("#0b2a66"))
+    c.drawCentredString(PAGE_W / 2, PAGE_H - 55 * mm, "Sales Performance Report")
+    c.setFont("Helvetica", 10)
+    c.setFillColor(colors.black)
+    c.drawCentredString(PAGE_W / 2, PAGE_H - 62 * mm, f"Generated on {now_str}")
+
+    # KPI Tiles
+    kpis = summary.kpis()
+    cols = 3
+    tile_w = (usable_w - (cols - 1) * 6 * mm) / cols
+    tile_h = 16 * mm
+    start_x = MARGIN
+    start_y = PAGE_H - 85 * mm
+    c.setFont("Helvetica", 9)
+    for i, (k, v) in enumerate(kpis):
+        col, row = i % cols, i // cols
+        x = start_x + col * (tile_w + 6 * mm)
+        y = start_y - row * (tile_h + 6 * mm)
+        c.setFillColor(colors.whitesmoke)
+        c.roundRect(x, y - tile_h, tile_w, tile_h, 3, stroke=0, fill=1)
+        c.setFillColor(colors.HexColor("#1565C0"))
+        c.setFont("Helvetica", 8)
+        c.drawString(x + 4 * mm, y - 6 * mm, k)
+        c.setFillColor(colors.black)
+        c.setFont("Helvetica-Bold", 9)
+        c.drawRightString(x + tile_w - 4 * mm, y - 6 * mm, v)
+
+    insight = summary.key_insight()
+    c.setFont("Helvetica", 10)
+    c.setFillColor(colors.black)
+    y_text = PAGE_H - 130 * mm
+    for line in textwrap.wrap(insight, 95):
+        c.drawString(MARGIN, y_text, line)
+        y_text -= 6 * mm
+
+    draw_footer(page_num)
+    c.showPage()
+    page_num += 1
+
+    # ---------- Chart Pages with Enhanced Insight Box ----------
+    for img, title, note, extra in charts:
+        draw_header(title)
+
+        # Draw graph (centered and scaled to fit)
+        if isinstance(img, Drawing):
+            draw_w, draw_h = img.width, img.height
+        else:
+            try:
+                iw, ih = img.getSize()
+                scale = min((usable_w) / iw, (PAGE_H - 90 * mm) / ih)
+                draw_w, draw_h = iw * scale, ih * scale
+            except Exception:
+                # fallback fixed size
+                draw_w, draw_h = usable_w, PAGE_H - 120 * mm
+
+        x = (PAGE_W - draw_w) / 2
+        y = (PAGE_H - draw_h) / 2 + 6 * mm  # slight nudge up for insight box
+        if isinstance(img, Drawing):
+            renderPDF.draw(img, c, x, y)
+        else:
+            c.drawImage(img, x, y, width=draw_w, height=draw_h, preserveAspectRatio=True, anchor='c', mask='auto')
+
+        # Divider Line above Insight Box
+        c.setStrokeColor(colors.HexColor("#B0BEC5"))
+        c.setLineWidth(0.5)
+        c.line(MARGIN, y - 10 * mm, PAGE_W - MARGIN, y - 10 * mm)
+
+        # Light-blue rounded box for insight
+        box_y = y - 40 * mm
+        box_height = 34 * mm
+        c.setFillColor(colors.HexColor("#E3F2FD"))
+        c.roundRect(MARGIN, box_y, usable_w, box_height, 6, stroke=0, fill=1)
+
+        # "Insight" heading
+        c.setFont("Helvetica-Bold", 11)
+        c.setFillColor(colors.HexColor("#0D47A1"))
+        c.drawString(MARGIN + 6 * mm, box_y + box_height - 9 * mm, "💡 Insight")
+
+        # Short note
+        c.setFont("Helvetica", 10)
+        c.setFillColor(colors.black)
+        text_y = box_y + box_height - 15 * mm
+        for line in textwrap.wrap(note, 95):
+            c.drawString(MARGIN + 10 * mm, text_y, line)
+            text_y -= 5 * mm
+
+        # Extended analysis
+        c.setFont("Helvetica", 9)
+        c.setFillColor(colors.black)
+        text_y -= 2 * mm
+        for line in textwrap.wrap(extra, 110):
+            c.drawString(MARGIN + 10 * mm, text_y, line)
+            text_y -= 4.5 * mm
+            if text_y < (10 * mm):  # safety: avoid overflow
+                break
+
+        draw_footer(page_num)
+        c.showPage()
+        page_num += 1
+
+    # ---------- Executive Summary Page ----------
+    draw_header("Executive Summary")
+    c.setFont("Helvetica-Bold", 18)
+    c.setFillColor(colors.HexColor("#0b2a66"))
+    c.drawCentredString(PAGE_W / 2, PAGE_H - 45 * mm, "Executive Summary of Key Insights")
+
+    c.setFont("Helvetica", 10)
+    y_pos = PAGE_H - 70 * mm
+    for line in summary.summary_points():
+        for wrapped_line in textwrap.wrap(line, 110):
+            c.drawString(MARGIN, y_pos, wrapped_line)
+            y_pos -= 8 * mm
+
+    c.setFont("Helvetica-Oblique", 10)
+    c.setFillColor(colors.grey)
+    c.drawString(MARGIN, y_pos - 6 * mm,
+                 "This executive summary aggregates chart-level insights for quick decision-making.")
+    draw_footer(page_num)
+    c.showPage()
+    page_num += 1
+
+    # ---------- Data Table (auto-split across pages) ----------
+    preview_cols = PREVIEW_COLUMNS
+    table_rows = df.reindex(columns=preview_cols, fill_value="")
+
+    available_width = PAGE_W - 2 * MARGIN
+    available_height = PAGE_H - 60 * mm
+    num_cols = len(preview_cols)
+    col_widths = [available_width / num_cols for _ in range(num_cols)]
+
+    if appendix == "full":
+        # One page of rows at a time: formatted, drawn and dropped before the next page
+        top = PAGE_H - 32 * mm
+        rows_per_page = int((top - 16 * mm) // TABLE_ROW_HEIGHT) - 1
+        for i, rows in enumerate(iter_row_pages(table_rows, rows_per_page)):
+            draw_header("Data Appendix")
+            if i == 0:
+                c.setFont("Helvetica-Bold", 14)
+                c.setFillColor(colors.HexColor("#1565C0"))
+                c.drawString(MARGIN, PAGE_H - 26 * mm, f"Full Data ({len(df):,} rows)")
+            draw_table_page(c, MARGIN, top, col_widths, preview_cols, rows)
+            draw_footer(page_num)
+            c.showPage()
+            compress_last_page(c)
+            page_num += 1
+        c.save()
+        return pdf_buffer.getvalue()
+
+    rows_to_show = table_rows.head(200).astype(str).values.tolist()  # show up to 200 if present
+    data = [preview_cols] + rows_to_show
+
+    draw_header("Data Preview")
+    c.setFont("Helvetica-Bold", 14)
+    c.setFillColor(colors.HexColor("#1565C0"))
+    c.drawString(MARGIN, PAGE_H - 26 * mm, "Data Preview (First rows)")
+
+    table = Table(data, repeatRows=1, colWidths=col_widths)
+    table.setStyle(TableStyle([
+        ("BACKGROUND", (0, 0), (-1, 0), colors.HexColor("#1565C0")),
+        ("TEXTCOLOR", (0, 0), (-1, 0), colors.whitesmoke),
+        ("ALIGN", (0, 0), (-1, -1), "CENTER"),
+        ("GRID", (0, 0), (-1, -1), 0.3, colors.grey),
+        ("FONTNAME", (0, 0), (-1, -1), "Helvetica"),
+        ("FONTSIZE", (0, 0), (-1, -1), 8),
+        ("ROWBACKGROUNDS", (0, 1), (-1, -1), [colors.whitesmoke, colors.white]),
+        ("VALIGN", (0, 0), (-1, -1), "MIDDLE"),
+    ]))
+
+    # Use Table.split to break the table into pages that fit available area
+    parts = table.split(available_width, available_height)
+    if not parts:
+        # fallback: draw single table
+        w, h = table.wrap(available_width, available_height)
+        x_pos = MARGIN
+        y_pos = PAGE_H - 60 * mm - h
+        table.drawOn(c, x_pos, y_pos)
+        draw_footer(page_num)
+        c.showPage()
+    else:
+        for part in parts:
+            # compute draw position for this part and render
+            w, h = part.wrap(available_width, available_height)
+            x_pos = MARGIN
+            y_pos = PAGE_H - 60 * mm - h
+            part.drawOn(c, x_pos, y_pos)
+            draw_footer(page_num)
+            c.showPage()
+            page_num += 1
+
+    c.save()
+    return pdf_buffer.getvalue()
+
+
+def burst_reports(ds, by, filters=None, progress=None, renderer=DEFAULT_CHART_RENDERER,
+                  appendix=DEFAULT_REPORT_APPENDIX, generated_at=None):
+    """One report per value of column `by` within a filtered view of `ds`.
+
+    Returns [(segment, pdf bytes), ...] in segment order. The view is selected
+    and split into segments once, every segment's charts are rendered in a
+    single batch, the segments are laid out in parallel in the renderer pool,
+    and all reports carry the same `generated_at` time.
+    Raises ValueError for an unknown split column, an empty view, or more than
+    REPORT_BURST_MAX_SEGMENTS segments.
+    """
+    _check_options(renderer, appendix)
+    progress = progress or (lambda stage: None)
+
+    progress("aggregate")
+    df, _ = ds.select(filters)
+    if by not in FILTER_COLUMNS or by not in df.columns:
+        raise ValueError(f"Cannot split reports by '{by}'.")
+    # Plain Python keys: numpy scalars would not survive normalize_filters() below
+    segments = {(k.item() if isinstance(k, np.generic) else k): rows
+                for k, rows in df.groupby(by, sort=True, observed=True).indices.items()}
+    if not segments:
+        raise ValueError("No data to generate PDF.")
+    if len(segments) > REPORT_BURST_MAX_SEGMENTS:
+        raise ValueError(f"'{by.lstrip('_')}' has {len(segments)} values; "
+                         f"at most {REPORT_BURST_MAX_SEGMENTS} reports can be generated at once.")
+    spec = normalize_filters(filters)
+    frames = [df.iloc[rows] for rows in segments.values()]
+    summaries = [summarize(ds, {**spec, by: [segment]}, count_customers=False) for segment in segments]
+
+    progress("charts")
+    charts = _render_charts(summaries, renderer)
+
+    progress("layout")
+    generated_at = generated_at or datetime.now()
+    pdfs = run_in_pool(_layout_report, [(summary, _table_rows(frame, appendix), pngs, appendix, generated_at)
+                                        for summary, frame, pngs in zip(summaries, frames, charts)])
+    return list(zip(segments, pdfs))
+
+
+def _file_part(value):
+    return re.sub(r"[^\w.-]+", "_", str(value)).strip("._") or "blank"
+
+
+def zip_reports(reports, by, generated_at=None):
+    """ZIP archive holding a Sales_Report_<by>_<segment>.pdf per burst_reports() entry."""
+    stamp = (generated_at or datetime.now()).timetuple()[:6]
+    buffer, names = io.BytesIO(), set()
+    with zipfile.ZipFile(buffer, "w") as zf:
+        for segment, pdf in reports:
+            base = f"Sales_Report_{_file_part(by)}_{_file_part(segment)}"
+            name, n = f"{base}.pdf", 1
+            while name in names:  # distinct values that sanitize to the same name
+                n += 1
+                name = f"{base}_{n}.pdf"
+            names.add(name)
+            zf.writestr(zipfile.ZipInfo(name, date_time=stamp), pdf, compress_type=zipfile.ZIP_DEFLATED)
+    return buffer.getvalue()
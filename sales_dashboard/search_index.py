@@ -0,0 +1,136 @@
+# search_index.py
+# Inverted index for the data table search box. Every distinct cell text of the
+# table columns becomes a term; terms are indexed by trigram (substring search)
+# and by sorted tokens (prefix search), and each (column, value) maps to its rows
+# through a per-column CSR layout, so a query never scans the rows themselves.
+
+import numpy as np
+import pandas as pd
+
+from .table import format_cell, table_columns
+
+
+class SearchIndex:
+    def __init__(self, frame, columns):
+        self.n = len(frame)
+        row_dtype = np.int32 if self.n < 2 ** 31 else np.int64
+        term_ids = {}
+        self.terms = []
+        self.term_cells = []   # term id -> [(column index, value code), ...]
+        self.row_order = []    # per column: rows sorted by value code
+        self.row_offsets = []  # per column: slice bounds of each code in row_order
+
+        for ci, col in enumerate(columns):
+            if col not in frame.columns:
+                self.row_order.append(np.empty(0, dtype=row_dtype))
+                self.row_offsets.append(np.zeros(1, dtype=np.int64))
+                continue
+            codes, uniques = pd.factorize(frame[col], use_na_sentinel=True)
+            # Missing values (code -1) land in bucket 0 and are never looked up
+            self.row_order.append(np.argsort(codes, kind="stable").astype(row_dtype))
+            counts = np.bincount(codes + 1, minlength=len(uniques) + 1)
+            self.row_offsets.append(np.concatenate([[0], np.cumsum(counts)]))
+            for code, value in enumerate(uniques.tolist()):
+                text = format_cell(value).lower()
+                if not text:
+                    continue
+                tid = term_ids.get(text)
+                if tid is None:
+                    tid = term_ids[text] = len(self.terms)
+                    self.terms.append(text)
+                    self.term_cells.append([])
+                self.term_cells[tid].append((ci, code))
+
+        # Trigram postings in CSR form: gram_terms[gram_offsets[g]:gram_offsets[g + 1]]
+        gram_list, gram_tids, tok_list, tok_tids = [], [], [], []
+        for tid, text in enumerate(self.terms):
+            grams = {text[i:i + 3] for i in range(len(text) - 2)}
+            gram_list.extend(grams)
+            gram_tids.extend([tid] * len(grams))
+            toks = set(text.split()) | {text} if " " in text else (text,)
+            tok_list.extend(toks)
+            tok_tids.extend([tid] * len(toks))
+        gram_codes, gram_uniques = pd.factorize(np.array(gram_list, dtype=object))
+        order = np.argsort(gram_codes, kind="stable")
+        self.gram_ids = {g: i for i, g in enumerate(gram_uniques.tolist())}
+        self.gram_terms = np.array(gram_tids, dtype=np.int32)[order]
+        self.gram_offsets = np.concatenate([[0], np.cumsum(np.bincount(gram_codes, minlength=len(gram_uniques)))])
+
+        # Sorted token keys for prefix lookups
+        keys = np.array(tok_list, dtype=str)
+        order = np.argsort(keys, kind="stable")
+        self.token_keys = keys[order]
+        self.token_terms = np.array(tok_tids, dtype=np.int32)[order]
+
+    @property
+    def nbytes(self):
+        """Approximate memory held: the arrays exactly, the term lists and gram
+        dictionary at typical CPython object sizes (walking them takes seconds)."""
+        arrays = sum(a.nbytes for a in (*self.row_order, *self.row_offsets, self.gram_terms, self.gram_offsets,
+                                        self.token_keys, self.token_terms))
+        cells = sum(len(c) for c in self.term_cells)
+        terms = sum(len(t) for t in self.terms) + 120 * len(self.terms)  # str + its cell list
+        return arrays + terms + 120 * cells + 160 * len(self.gram_ids)  # (column, code) tuples
+
+    def matching_terms(self, query, mode="contains"):
+        q = (query or "").strip().lower()
+        if not q:
+            return []
+        if mode == "prefix":
+            lo = np.searchsorted(self.token_keys, q, side="left")
+            hi = np.searchsorted(self.token_keys, q + "\uffff", side="left")
+            return np.unique(self.token_terms[lo:hi]).tolist()
+        if len(q) < 3:
+            # Too short for trigrams; the term dictionary is still far smaller than the rows
+            return [tid for tid, text in enumerate(self.terms) if q in text]
+
+        postings = []
+        for g in {q[i:i + 3] for i in range(len(q) - 2)}:
+            gid = self.gram_ids.get(g)
+            if gid is None:
+                return []
+            postings.append(self.gram_terms[self.gram_offsets[gid]:self.gram_offsets[gid + 1]])
+        postings.sort(key=len)
+        candidates = postings[0]
+        for ids in postings[1:]:
+            candidates = np.intersect1d(candidates, ids, assume_unique=True)
+        return [tid for tid in candidates.tolist() if q in self.terms[tid]]
+
+    def rows(self, query, mode="contains"):
+        """Sorted row positions with at least one cell matching `query`."""
+        parts = []
+        for tid in self.matching_terms(query, mode):
+            for ci, code in self.term_cells[tid]:
+                offsets = self.row_offsets[ci]
+                parts.append(self.row_order[ci][offsets[code + 1]:offsets[code + 2]])
+        if not parts:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(parts))
+
+    def mask(self, query, mode="contains"):
+        keep = np.zeros(self.n, dtype=bool)
+        keep[self.rows(query, mode)] = True
+        return keep
+
+
+def scan_mask(frame, columns, query, mode="contains"):
+    """Same matches as SearchIndex.mask, found by testing each column's distinct values."""
+    q = (query or "").strip().lower()
+    keep = np.zeros(len(frame), dtype=bool)
+    if not q:
+        return keep
+    for col in columns:
+        if col not in frame.columns:
+            continue
+        codes, uniques = pd.factorize(frame[col], use_na_sentinel=True)
+        texts = [format_cell(value).lower() for value in uniques.tolist()]
+        if mode == "prefix":
+            hits = [i for i, t in enumerate(texts) if t and any(w.startswith(q) for w in t.split() + [t])]
+        else:
+            hits = [i for i, t in enumerate(texts) if q in t]
+        keep |= np.isin(codes, hits)
+    return keep
+
+
+def build_search_index(ds):
+    return SearchIndex(ds.frame, table_columns(ds.cost_col))
@@ -0,0 +1,147 @@
+# summary.py
+# Headline numbers for a filtered view: KPI totals, the category/month/country
+# breakdowns and the "top" picks behind the PDF report, its insight text and the
+# dashboard's KPI cards. Everything is rolled up in one pass over the dataset's
+# data cube cells rather than re-scanning rows once per statistic.
+
+from dataclasses import asdict, dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from .cube import build_cube
+from .ingest import MONTH_ABBR
+
+NONE = "—"
+
+
+@dataclass
+class ReportSummary:
+    rows: int
+    customers: int  # distinct customer names; None when not counted
+    turnover: float
+    cost: float
+    profit: float
+    category_profit: list = field(default_factory=list)  # [(category, profit)], most profitable first
+    month_sales: list = field(default_factory=list)      # [(month abbr, sales)], Jan..Dec where present
+    country_sales: list = field(default_factory=list)    # [(country, sales)], largest first
+    top_product: str = NONE         # most transactions
+    top_product_count: int = 0
+    top_profit_product: str = NONE  # most profit
+    top_profit_product_profit: float = 0.0
+    top_country: str = NONE         # most transactions
+    top_country_count: int = 0
+
+    @property
+    def profit_pct(self):
+        return (self.profit / self.cost * 100) if self.cost > 0 else 0.0
+
+    @property
+    def top_category(self):
+        return self.category_profit[0][0] if self.category_profit else NONE
+
+    @property
+    def top_sales_country(self):
+        return self.country_sales[0] if self.country_sales else (NONE, 0)
+
+    @property
+    def peak_month(self):
+        return max(self.month_sales, key=lambda m: m[1])[0] if self.month_sales else NONE
+
+    @property
+    def low_month(self):
+        return min(self.month_sales, key=lambda m: m[1])[0] if self.month_sales else NONE
+
+    def kpis(self):
+        """(label, formatted value) pairs for the report's KPI tiles."""
+        return [
+            ("Turnover", f"₹{int(self.turnover):,}"),
+            ("Cost", f"₹{int(self.cost):,}"),
+            ("Profit", f"₹{int(self.profit):,}"),
+            ("Profit %", f"{self.profit_pct:.1f}%"),
+            ("Top Product", self.top_product),
+            ("Top Country", self.top_country),
+        ]
+
+    def key_insight(self):
+        return (f"Key Insight: The {self.top_category} category and {self.top_profit_product} "
+                "product are driving most profits.")
+
+    def summary_points(self):
+        country, sales = self.top_sales_country
+        return [
+            f"• Top profit category: {self.top_category}",
+            f"• Most profitable product: {self.top_profit_product}",
+            f"• Top country: {country} (₹{int(sales):,})",
+            f"• Peak sales month: {self.peak_month}  |  Lowest sales month: {self.low_month}",
+            "• Recommendation: Promote top categories, review costs for low-margin categories, and run seasonal campaigns.",
+        ]
+
+    def to_dict(self):
+        return {**asdict(self), "profit_pct": self.profit_pct, "top_category": self.top_category,
+                "peak_month": self.peak_month, "low_month": self.low_month}
+
+
+def _rollup(cells, values, dim, measure):
+    """`measure` summed per value of `dim` over the selected cube cells (blank values dropped)."""
+    labels = pd.Series(values[dim][cells[dim].to_numpy()], index=cells.index)
+    keep = labels.notna() & (labels != "")
+    return cells.loc[keep, measure].groupby(labels[keep].tolist()).sum()
+
+
+def _pairs(sums):
+    return list(zip(sums.index.tolist(), np.asarray(sums, dtype=float).tolist()))
+
+
+def _top(sums):
+    # Largest total; ties go to the first label in sort order (like Series.mode)
+    if sums.empty:
+        return NONE, 0
+    sums = sums.sort_index(kind="stable")
+    return sums.idxmax(), sums.max()
+
+
+def summarize(ds, filters=None, rows=None, count_customers=True):
+    """ReportSummary of the filtered view of `ds`.
+
+    The distinct customer count is the one figure the cube cannot roll up; it
+    reads the filtered rows (`rows`, when the caller has already selected them)
+    and is skipped with `count_customers=False`.
+    """
+    cube = ds.derived("cube", build_cube)
+    cells = cube.cells[cube.mask(filters)]
+    customers = None
+    if count_customers:
+        if rows is None:
+            rows, _ = ds.select(filters)
+        names = rows["Customer Name"]
+        customers = int(names[names.notna() & (names != "")].nunique())
+
+    product_count = _rollup(cells, cube.values, "Product", "count")
+    product_profit = _rollup(cells, cube.values, "Product", "profit")
+    country_count = _rollup(cells, cube.values, "Country", "count")
+    category_profit = _rollup(cells, cube.values, "Category", "profit").sort_values(ascending=False, kind="stable")
+    country_sales = _rollup(cells, cube.values, "Country", "sales").sort_values(ascending=False, kind="stable")
+    month_sales = _rollup(cells, cube.values, "__Month", "sales")
+    order = {m: i for i, m in enumerate(MONTH_ABBR)}
+    month_sales = month_sales[sorted(month_sales.index, key=lambda m: order.get(m, len(order)))]
+
+    top_product, top_product_count = _top(product_count)
+    top_profit_product, top_profit = _top(product_profit)
+    top_country, top_country_count = _top(country_count)
+    return ReportSummary(
+        rows=int(cells["count"].sum()),
+        customers=customers,
+        turnover=float(cells["sales"].sum()),
+        cost=float(cells["cost"].sum()),
+        profit=float(cells["profit"].sum()),
+        category_profit=_pairs(category_profit),
+        month_sales=_pairs(month_sales),
+        country_sales=_pairs(country_sales),
+        top_product=top_product,
+        top_product_count=int(top_product_count),
+        top_profit_product=top_profit_product,
+        top_profit_product_profit=float(top_profit),
+        top_country=top_country,
+        top_country_count=int(top_country_count),
+    )
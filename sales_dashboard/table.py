@@ -0,0 +1,102 @@
+# table.py
+# Server-side paging, sorting and searching for the dashboard's data table.
+# Sort orders are computed once per (dataset, column, direction) and reused;
+# each page request then only masks the cached order and slices it.
+
+import numpy as np
+import pandas as pd
+
+TABLE_PAGE_SIZE = 50
+TABLE_MAX_PAGE_SIZE = 1000
+SEARCH_MODES = ("contains", "prefix")
+
+
+def table_columns(cost_col):
+    return ["Customer Name", "Age", "Country", "Product", "Purchase Date", cost_col,
+            "Payment Mode", "Category", "Selling Price", "__Profit", "__Age Group", "__Month"]
+
+
+def format_cell(v):
+    if v is None or (isinstance(v, float) and np.isnan(v)):
+        return ""
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+
+def _rank(series):
+    """Dense sort rank of each row; missing values get -1."""
+    try:
+        codes, _ = pd.factorize(series, sort=True, use_na_sentinel=True)
+    except TypeError:
+        # Mixed types (e.g. numbers and text in one column) sort by their text
+        codes, _ = pd.factorize(series.astype(str).where(series.notna()), sort=True, use_na_sentinel=True)
+    return codes
+
+
+def sort_order(ds, column, descending=False):
+    """Row positions ordered by `column` (stable; missing values always last)."""
+    def build(d):
+        rank = _rank(d.frame[column])
+        top = rank.max() + 1 if len(rank) else 0
+        key = np.where(rank < 0, top, (top - 1 - rank) if descending else rank)
+        return np.argsort(key, kind="stable")
+    return ds.derived(("order", column, bool(descending)), build)
+
+
+def search_mask(ds, query, mode="contains"):
+    """Rows where any table cell contains (or, in prefix mode, starts a word with) `query`.
+
+    While the dataset's search index is still being built in the background,
+    the rows are scanned instead of waiting for it.
+    """
+    if not (query or "").strip():
+        return None
+    from .search_index import build_search_index, scan_mask
+    index = ds.peek("search")
+    if index is None:
+        ds.derived_async("search", build_search_index)
+        return scan_mask(ds.frame, table_columns(ds.cost_col), query, mode)
+    return index.mask(query, mode)
+
+
+def table_page(ds, filters=None, sort=None, descending=False, cursor=None, limit=TABLE_PAGE_SIZE,
+               query=None, search_mode="contains"):
+    columns = table_columns(ds.cost_col)
+    if sort is not None and sort not in columns:
+        raise ValueError(f"Cannot sort by '{sort}'.")
+    if search_mode not in SEARCH_MODES:
+        raise ValueError(f"Unknown search mode '{search_mode}'.")
+    try:
+        offset = max(0, int(cursor or 0))
+        limit = min(max(1, int(limit)), TABLE_MAX_PAGE_SIZE)
+    except (TypeError, ValueError):
+        raise ValueError("Invalid cursor or limit.")
+
+    def page_rows(frame, dates):
+        keep = ds.mask(filters)
+        found = search_mask(ds, query, search_mode)
+        if found is not None:
+            keep = keep & found
+
+        if sort is None:
+            rows = np.flatnonzero(keep)
+        else:
+            order = sort_order(ds, sort, descending)
+            rows = order[keep[order]]
+        return rows, frame.iloc[rows[offset:offset + limit]]
+
+    # The mask, sort order and rows must all come from the same version of the dataset
+    rows, frame = ds.read(page_rows)
+    records = [
+        [None if (isinstance(v, float) and np.isnan(v)) else v for v in row]
+        for row in frame.reindex(columns=columns).astype(object).itertuples(index=False, name=None)
+    ]
+    end = offset + len(frame)
+    return {
+        "columns": columns,
+        "rows": records,
+        "total": int(len(rows)),
+        "offset": offset,
+        "next_cursor": str(end) if end < len(rows) else None,
+    }
@@ -0,0 +1,868 @@
+# templates.py
+# Inline Jinja templates for the login page and the dashboard.
+
+# -------------------- Login HTML --------------------
+LOGIN_HTML = r"""
+<!doctype html>
+<html lang="en" data-bs-theme="dark">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Login | Sales Dashboard</title>
+  <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
+  <style>
+    body { background:#0b0e14; color:#e6edf3; }
+    .card { background:#0f1624; border:1px solid #1f2a3a; }
+    .form-control { background:#0f1624; color:#e6edf3; border-color:#1f2a3a; }
+    .btn-primary { background:#2563eb; border-color:#2563eb; }
+  </style>
+</head>
+<body>
+  <div class="container py-5">
+    <div class="row justify-content-center">
+      <div class="col-md-5">
+        <div class="card p-4">
+          <h4 class="mb-3 text-center">🔐 Login</h4>
+          {% with messages = get_flashed_messages() %}
+            {% if messages %}
+              <div class="alert alert-danger py-2">{{ messages[0] }}</div>
+            {% endif %}
+          {% endwith %}
+          <form method="POST" action="{{ url_for('login') }}">
+            <div class="mb-3">
+              <label class="form-label">Email</label>
+              <input name="email" type="email" class="form-control" placeholder="admin@example.com" required>
+            </div>
+            <div class="mb-3">
+              <label class="form-label">Password</label>
+              <input name="password" type="password" class="form-control" placeholder="••••" required>
+            </div>
+            <button class="btn btn-primary w-100">Login</button>
+          </form>
+          <p class="text-secondary small mt-3">
+            Default user (auto-created if missing): <code>admin@example.com / 1234</code>
+          </p>
+        </div>
+      </div>
+    </div>
+  </div>
+</body>
+</html>
+"""
+
+
+# -------------------- Dashboard HTML --------------------
+HTML = r"""
+<!doctype html>
+<html lang="en" data-bs-theme="dark">
+<head>
+  <meta charset="utf-8">
+  <meta name="viewport" content="width=device-width, initial-scale=1">
+  <title>Sales Dashboard (Dark)</title>
+  <link href="https://cdn.jsdelivr.net/npm/bootstrap@5.3.3/dist/css/bootstrap.min.css" rel="stylesheet">
+  <script src="https://cdn.plot.ly/plotly-2.35.2.min.js"></script>
+  <style>
+    body { background: #0b0e14; color:#e6edf3; }
+    .navbar { background:#111826; }
+    .card { background:#0f1624; border:1px solid #1f2a3a; }
+    .form-select, .form-control { background:#0f1624; color:#e6edf3; border-color:#1f2a3a; }
+    .btn-primary { background:#2563eb; border-color:#2563eb; }
+    .btn-outline-info { border-color:#38bdf8; color:#38bdf8; }
+    .btn-outline-info:hover { background:#38bdf8; color:#0b0e14; }
+    .kpi { font-size:1.25rem; font-weight:600; }
+    .kpi-sub { font-size:.9rem; color:#9aa4b2; }
+    .chip { display:inline-block; padding:.3rem .6rem; margin:.15rem; border-radius:999px; border:1px solid #1f2a3a; background:#111826; }
+    .sticky-top-lite { position: sticky; top: 0; z-index: 1020; background: #0b0e14; padding-top: .5rem; }
+    .note { color:#9aa4b2; font-size:.9rem; }
+    .mini-kpi { font-size:1.1rem; font-weight:700; }
+    .badge-soft { background:#111826; border:1px solid #1f2a3a; color:#9cc0ff; }
+    a { text-decoration:none; }
+  </style>
+</head>
+<body>
+<nav class="navbar navbar-dark px-3 mb-4">
+  <span class="navbar-brand mb-0 h1">📊 Sales Dashboard</span>
+  <div class="ms-auto d-flex gap-2">
+    <a class="btn btn-outline-info btn-sm" href="{{ url_for('download_template') }}">Download Excel Template</a>
+    <a class="btn btn-secondary btn-sm" href="{{ url_for('logout') }}">Logout</a>
+  </div>
+</nav>
+
+<div class="container">
+  {% if not has_data %}
+    <div class="row justify-content-center">
+      <div class="col-lg-7">
+        <div class="card p-4">
+          <div class="d-flex align-items-center mb-2">
+            <h4 class="mb-0">Upload Excel (.xlsx) or CSV</h4>
+            <a class="btn btn-outline-info btn-sm ms-auto" href="{{ url_for('download_template') }}">⬇ Download Template</a>
+          </div>
+          <form action="/dashboard" method="POST" enctype="multipart/form-data">
+            <input class="form-control mb-3" type="file" name="excel_file" accept=".xlsx,.csv" required>
+            <button class="btn btn-primary w-100">Generate Dashboard</button>
+          </form>
+          <p class="mt-3 text-secondary small">
+            Expected columns (fixed): Customer Name, Age, Country, Product, Purchase Date,
+            Purchase Amount, Payment Mode, Category, Selling Price
+          </p>
+        </div>
+      </div>
+    </div>
+  {% else %}
+
+    <!-- Filters + Actions -->
+    <div class="sticky-top-lite">
+      <div class="card p-3">
+        <div class="row g-3 align-items-end">
+          <div class="col-md-2">
+            <label class="form-label">Category</label>
+            <select id="f_category" class="form-select" multiple></select>
+          </div>
+          <div class="col-md-2">
+            <label class="form-label">Product</label>
+            <select id="f_product" class="form-select" multiple></select>
+          </div>
+          <div class="col-md-2">
+            <label class="form-label">Age Group</label>
+            <select id="f_age" class="form-select" multiple></select>
+          </div>
+          <div class="col-md-2">
+            <label class="form-label">Country</label>
+            <select id="f_country" class="form-select" multiple></select>
+          </div>
+          <div class="col-md-2">
+            <label class="form-label">Payment</label>
+            <select id="f_pay" class="form-select" multiple></select>
+          </div>
+          <div class="col-md-2">
+            <label class="form-label">Month</label>
+            <select id="f_month" class="form-select" multiple></select>
+          </div>
+          <div class="col-12 d-flex gap-2 mt-2">
+            <button class="btn btn-primary" onclick="applyFilters()">Apply Filters (Affects Forecast)</button>
+            <button class="btn btn-secondary" onclick="resetFilters()">Reset</button>
+            <button id="btn_pdf" class="btn btn-outline-info" onclick="downloadPDF()">Download PDF</button>
+            <select id="pdf_split" class="form-select w-auto" title="One PDF per value, downloaded as a ZIP">
+              <option value="" selected>Single report</option>
+              <option value="Country">One per Country</option>
+              <option value="Category">One per Category</option>
+              <option value="Payment Mode">One per Payment Mode</option>
+            </select>
+          </div>
+          <div class="text-secondary small mt-1">PDF includes: KPI summary, key insights, and a 30-row preview (charts omitted for compatibility).</div>
+        </div>
+      </div>
+    </div>
+
+    <!-- KPIs -->
+    <div class="row g-3 mt-3">
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_turnover">₹0</div><div class="kpi-sub">Total Turnover</div></div></div>
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_cost">₹0</div><div class="kpi-sub">Total Cost</div></div></div>
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_profit">₹0</div><div class="kpi-sub">Total Profit</div></div></div>
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_profit_pct">0%</div><div class="kpi-sub">Profit %</div></div></div>
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_customers">0</div><div class="kpi-sub">Total Customers</div></div></div>
+      <div class="col-md-2"><div class="card p-3"><div class="kpi" id="kpi_txn">0</div><div class="kpi-sub">Transactions</div></div></div>
+    </div>
+
+    <!-- Lists + Tops -->
+    <div class="row g-3 mt-1">
+      <div class="col-md-4">
+        <div class="card p-3">
+          <h5 class="mb-3">All Categories / Products / Age Groups</h5>
+          <div class="mb-2"><span class="kpi-sub">Categories:</span><div id="list_categories" class="mt-2"></div></div>
+          <div class="mb-2"><span class="kpi-sub">Products:</span><div id="list_products" class="mt-2"></div></div>
+          <div class="mb-2"><span class="kpi-sub">Age Groups:</span><div id="list_ages" class="mt-2"></div></div>
+        </div>
+      </div>
+      <div class="col-md-8">
+        <div class="card p-3">
+          <div class="row g-3">
+            <div class="col-md-6"><h6>Top Selling Product</h6><div id="top_product" class="kpi"></div></div>
+            <div class="col-md-6"><h6>Most Profitable Product</h6><div id="top_profit_product" class="kpi"></div></div>
+            <div class="col-md-6"><h6>Most Active Country</h6><div id="top_country" class="kpi"></div></div>
+            <div class="col-md-6"><h6>Best Category (Profit)</h6><div id="top_category" class="kpi"></div></div>
+          </div>
+        </div>
+      </div>
+    </div>
+
+    <!-- Original Charts -->
+    <div class="row g-3 mt-1">
+      <div class="col-md-6"><div class="card p-3"><h5>Country vs Product Count</h5><div id="chart_country_product"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Category vs Profit</h5><div id="chart_category_profit"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Payment Mode vs Profit</h5><div id="chart_payment_profit"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Month vs Profit</h5><div id="chart_month_profit"></div></div></div>
+    </div>
+
+    <!-- New Charts (Requested) -->
+    <div class="row g-3 mt-1">
+      <div class="col-md-6"><div class="card p-3"><h5>Leading Category (Profit %) — Pie</h5><div id="chart_cat_profit_pct"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Country-wise Sales Share — Pie</h5><div id="chart_country_sales_share"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Category vs Total Sales — Bar</h5><div id="chart_category_sales"></div></div></div>
+      <div class="col-md-6"><div class="card p-3"><h5>Month vs Sales Trend — Line</h5><div id="chart_month_sales_trend"></div></div></div>
+    </div>
+
+    <!-- Time series (server-side rollups) -->
+    <div class="card p-3 mt-3">
+      <div class="d-flex align-items-center gap-2">
+        <h5 class="me-auto mb-0">Sales, Cost & Profit over Time</h5>
+        <select id="ts_granularity" class="form-select form-select-sm w-auto" onchange="runTimeseries()">
+          <option value="day">Daily</option>
+          <option value="week">Weekly</option>
+          <option value="month" selected>Monthly</option>
+          <option value="quarter">Quarterly</option>
+        </select>
+      </div>
+      <div id="chart_timeseries"></div>
+    </div>
+
+    <!-- ===== Forecast (inside same page) ===== -->
+    <div class="card p-3 mt-3">
+      <div class="d-flex align-items-center gap-2">
+        <h5 class="me-auto mb-0">🔮 Forecast</h5>
+        <span class="badge badge-soft">Uses current filters</span>
+      </div>
+      <div class="row g-3 align-items-end mt-1">
+        <div class="col-md-2">
+          <label class="form-label">Forecast Horizon</label>
+          <select id="fc_horizon" class="form-select">
+            <option value="1">Next 1 month</option>
+            <option value="3" selected>Next 3 months</option>
+            <option value="6">Next 6 months</option>
+          </select>
+        </div>
+        <div class="col-md-10 d-flex align-items-end">
+          <button class="btn btn-primary ms-auto" onclick="runForecast()">Run Forecast</button>
+        </div>
+      </div>
+
+      <div class="row g-3 mt-2">
+        <div class="col-md-4">
+          <div class="card p-3">
+            <div class="kpi-sub">Next Month (Predicted Sales)</div>
+            <div class="mini-kpi" id="pred_next_month">—</div>
+            <div class="note mt-2" id="pred_note">Run forecast to see prediction.</div>
+          </div>
+        </div>
+        <div class="col-md-8">
+          <div id="chart_forecast"></div>
+        </div>
+      </div>
+    </div>
+
+    <!-- Table -->
+    <div class="card p-3 mt-3 mb-5">
+      <div class="d-flex align-items-center">
+        <h5 class="me-auto">All Records (Filtered)</h5>
+        <input class="form-control w-auto" placeholder="Search..." oninput="searchTable(this.value)">
+      </div>
+      <div class="table-responsive mt-3">
+        <table class="table table-sm" id="data_table">
+          <thead></thead><tbody></tbody>
+        </table>
+      </div>
+      <div class="d-flex align-items-center gap-2">
+        <small class="text-secondary me-auto" id="tbl_info"></small>
+        <button id="tbl_prev" class="btn btn-sm btn-secondary" onclick="tablePage(-1)">‹ Prev</button>
+        <button id="tbl_next" class="btn btn-sm btn-secondary" onclick="tablePage(1)">Next ›</button>
+      </div>
+    </div>
+  {% endif %}
+</div>
+<!-- Toast container (bottom-right) -->
+<style>
+  .cg-toast { min-width: 260px; max-width: 420px; background: #0f1624; color: #e6edf3; border:1px solid #1f2a3a; box-shadow: 0 6px 18px rgba(0,0,0,0.6); border-radius:8px; padding:12px; }
+  .cg-toast .cg-title { font-weight:700; margin-bottom:6px; }
+  .cg-toast .cg-body { font-size:0.95rem; color:#cbd6e4; }
+  .cg-spinner { width:18px; height:18px; border:3px solid rgba(255,255,255,0.12); border-top-color: rgba(255,255,255,0.9); border-radius:50%; display:inline-block; vertical-align:middle; margin-right:8px; animation: cg-spin 0.9s linear infinite; }
+  @keyframes cg-spin { to { transform: rotate(360deg); } }
+</style>
+
+<div id="cg-toast-container" class="position-fixed" style="right:16px; bottom:18px; z-index:10800;"></div>
+
+
+<script>
+{% if has_data %}
+  // ===== Data from Flask (fetched from /data/<id> once the page loads) =====
+  let RAW = [];
+  const COLS = {
+    customer: "Customer Name",
+    age: "Age",
+    country: "Country",
+    product: "Product",
+    date: "Purchase Date",
+    cost: "{{ cost_col }}",
+    pay: "Payment Mode",
+    category: "Category",
+    sell: "Selling Price",
+    profit: "__Profit",
+    age_group: "__Age Group",
+    month: "__Month"
+  };
+  let CURRENT = [];
+  // Server-side copy of RAW; requests send only its id and the applied filter spec
+  const DATASET_ID = "{{ dataset_id }}";
+  let APPLIED_FILTERS = {};
+
+  // Columnar payload decoding (see payload.py for the format)
+  const CODE_ARRAYS = { u1: Uint8Array, u2: Uint16Array, u4: Uint32Array };
+  function b64Bytes(s){ const bin=atob(s); const out=new Uint8Array(bin.length); for(let i=0;i<bin.length;i++) out[i]=bin.charCodeAt(i); return out; }
+  function decodeColumn(spec){
+    if(spec.type==="num"){ return Array.from(new Float64Array(b64Bytes(spec.data).buffer), v=> Number.isNaN(v) ? null : v); }
+    if(spec.type==="dict"){ const vals=[null, ...spec.values]; return Array.from(new CODE_ARRAYS[spec.dtype](b64Bytes(spec.codes).buffer), c=> vals[c]); }
+    return spec.values;
+  }
+  function decodeColumnar(payload){
+    const names=Object.keys(payload.columns), cols=names.map(n=> decodeColumn(payload.columns[n]));
+    const rows=new Array(payload.length);
+    for(let i=0;i<payload.length;i++){ const r={}; for(let j=0;j<names.length;j++) r[names[j]]=cols[j][i]; rows[i]=r; }
+    return rows;
+  }
+  async function loadData(){
+    const resp = await fetch(`/data/${DATASET_ID}`);
+    if(!resp.ok) throw new Error(`Failed to load dataset (${resp.status})`);
+    RAW = decodeColumnar(await resp.json());
+    CURRENT = [...RAW];
+  }
+
+  // Utilities
+  function uniqueSorted(arr){ return [...new Set(arr.filter(x=>x!==null && x!==undefined && x!=="" ))].sort((a,b)=> (a+'').localeCompare(b+'')); }
+  function sum(arr, key){ return arr.reduce((s, r)=> s + (+r[key] || 0), 0); }
+  function countBy(arr, key){ const m={}; arr.forEach(r=>{const k=r[key]; m[k]=(m[k]||0)+1;}); return m; }
+  function sumBy(arr, keyGroup, keyVal){ const m={}; arr.forEach(r=>{const k=r[keyGroup]; const v=+r[keyVal]||0; m[k]=(m[k]||0)+v;}); return m; }
+  function fmtINR(n){ if(!isFinite(n)) return "₹0"; return "₹"+Math.round(n).toLocaleString("en-IN"); }
+
+  // Filters
+// ✅ Smart Interlinked Filters (Category, Product, Age Group, Country, Payment, Month)
+
+const FILTER_IDS=[["f_category",COLS.category],["f_product",COLS.product],["f_age",COLS.age_group],
+                  ["f_country",COLS.country],["f_pay",COLS.pay],["f_month",COLS.month]];
+
+function fillSelect(id, values, preserveSelection=true, counts=null){
+  const el=document.getElementById(id);
+  const prev = preserveSelection ? Array.from(el.selectedOptions).map(o=>o.value) : [];
+  el.innerHTML="";
+  values.forEach(v=>{
+    const o=document.createElement("option");
+    o.value=v; o.textContent = counts && (v in counts) ? `${v} (${counts[v]})` : v;
+    if(preserveSelection && prev.includes(v)) o.selected = true;
+    el.appendChild(o);
+  });
+}
+
+function selectedValues(id){
+  return Array.from(document.getElementById(id).selectedOptions).map(o=>o.value);
+}
+
+function initFilters(){
+  // Fill with initial full lists
+  updateAllFilters(localFacets(RAW));
+
+  // Add event listeners to all filter boxes
+  ["f_category","f_product","f_age","f_country","f_pay","f_month"].forEach(id=>{
+    document.getElementById(id).addEventListener("change", onAnyFilterChange);
+  });
+}
+
+// Remaining values (and row counts) per filter column: {column: {values:[...], counts:{value:n}}}
+function localFacets(dataset){
+  const out={};
+  FILTER_IDS.forEach(([id,col])=>{ out[col]={ values: uniqueSorted(dataset.map(r=>r[col])), counts: countBy(dataset, col) }; });
+  return out;
+}
+
+async function serverFacets(spec){
+  const resp = await fetch("/facets", {
+    method: "POST",
+    headers: {"Content-Type":"application/json"},
+    body: JSON.stringify({ dataset_id: DATASET_ID, filters: spec })
+  });
+  if(!resp.ok) throw new Error(`Facets failed (${resp.status})`);
+  const data = await resp.json(), out={};
+  Object.entries(data.facets).forEach(([col,f])=>{
+    // Missing values (null) are counted but, as in uniqueSorted, not offered as options
+    const counts={}; f.values.forEach((v,i)=> counts[v]=f.counts[i]);
+    out[col]={ values: f.values.filter(v=>v!==null), counts };
+  });
+  return out;
+}
+
+async function onAnyFilterChange(){
+  // Large uploads: the server evaluates the selection against its bitmap index
+  if(RAW.length > AGG_SERVER_THRESHOLD){
+    try { updateAllFilters(await serverFacets(filterSpec())); }
+    catch(err) { console.error(err); }
+    return;
+  }
+
+  // Filter RAW according to all currently selected filters
+  const fc=selectedValues("f_category"), fp=selectedValues("f_product"), fa=selectedValues("f_age"),
+        fco=selectedValues("f_country"), fpay=selectedValues("f_pay"), fm=selectedValues("f_month");
+
+  const filtered = RAW.filter(r=>{
+    const conds=[];
+    if(fc.length)  conds.push(fc.includes(r[COLS.category]));
+    if(fp.length)  conds.push(fp.includes(r[COLS.product]));
+    if(fa.length)  conds.push(fa.includes(r[COLS.age_group]));
+    if(fco.length) conds.push(fco.includes(r[COLS.country]));
+    if(fpay.length)conds.push(fpay.includes(r[COLS.pay]));
+    if(fm.length)  conds.push(fm.includes(r[COLS.month]));
+    return conds.every(Boolean);
+  });
+
+  // Update all dropdowns based on filtered dataset
+  updateAllFilters(localFacets(filtered));
+}
+
+function updateAllFilters(facets){
+  const monthOrder=["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"];
+  FILTER_IDS.forEach(([id,col])=>{
+    const values=uniqueSorted(facets[col].values);
+    fillSelect(id, col===COLS.month ? monthOrder.filter(m=>values.includes(m)) : values, true, facets[col].counts);
+  });
+}
+
+function filterSpec(){
+  const spec={};
+  FILTER_IDS.forEach(([id,col])=>{
+    const v=selectedValues(id); if(v.length) spec[col]=v;
+  });
+  return spec;
+}
+
+// Rows of RAW matching a filter spec ({column: [values]})
+function rowsMatching(spec){
+  const conds=Object.entries(spec);
+  return RAW.filter(r=> conds.every(([col,values])=> values.includes(r[col])));
+}
+
+function applyFilters(){
+  APPLIED_FILTERS = filterSpec();
+  // Large uploads aggregate on the server; their rows are only filtered here on demand (CSV export)
+  CURRENT = RAW.length > AGG_SERVER_THRESHOLD ? null : rowsMatching(APPLIED_FILTERS);
+  refreshAll();
+}
+
+function resetFilters(){
+  ["f_category","f_product","f_age","f_country","f_pay","f_month"].forEach(id=>{
+    Array.from(document.getElementById(id).options).forEach(o=>o.selected=false);
+  });
+  APPLIED_FILTERS = {};
+  if(RAW.length > AGG_SERVER_THRESHOLD){
+    CURRENT = null;
+    serverFacets({}).then(updateAllFilters).catch(err=>console.error(err));
+  } else {
+    updateAllFilters(localFacets(RAW));
+    CURRENT=[...RAW];
+  }
+  refreshAll();
+}
+
+  // KPIs & Tops
+  // Aggregates behind the KPIs, tops and charts: computed in the browser for small uploads,
+  // fetched from /aggregate (one batched request) once RAW exceeds AGG_SERVER_THRESHOLD rows.
+  const AGG_SERVER_THRESHOLD = {{ agg_threshold }};
+  function localAggregates(){
+    return {
+      turnover: sum(CURRENT, COLS.sell), cost: sum(CURRENT, COLS.cost), profit: sum(CURRENT, COLS.profit),
+      customers: uniqueSorted(CURRENT.map(r=>r[COLS.customer])).length, txn: CURRENT.length,
+      productCount: countBy(CURRENT, COLS.product), productProfit: sumBy(CURRENT, COLS.product, COLS.profit),
+      countryCount: countBy(CURRENT, COLS.country), countrySales: sumBy(CURRENT, COLS.country, COLS.sell),
+      categoryProfit: sumBy(CURRENT, COLS.category, COLS.profit), categorySales: sumBy(CURRENT, COLS.category, COLS.sell),
+      payProfit: sumBy(CURRENT, COLS.pay, COLS.profit),
+      monthProfit: sumBy(CURRENT, COLS.month, COLS.profit), monthSales: sumBy(CURRENT, COLS.month, COLS.sell),
+      ageCount: countBy(CURRENT, COLS.age_group)
+    };
+  }
+  async function serverAggregates(){
+    // KPI totals and tops come from /summary, the same figures the PDF report prints
+    const q=(dimensions, measures)=>({dimensions, measures});
+    const post=(url, body)=>fetch(url, { method: "POST", headers: {"Content-Type":"application/json"}, body: JSON.stringify(body) });
+    const [resp, sumResp] = await Promise.all([
+      post("/aggregate", { dataset_id: DATASET_ID, filters: APPLIED_FILTERS, queries: [
+        q([COLS.product], ["count","profit"]), q([COLS.country], ["count","sales"]),
+        q([COLS.category], ["profit","sales"]), q([COLS.pay], ["profit"]),
+        q([COLS.month], ["profit","sales"]), q([COLS.age_group], ["count"])
+      ]}),
+      post("/summary", { dataset_id: DATASET_ID, filters: APPLIED_FILTERS })
+    ]);
+    if(!resp.ok) throw new Error(`Aggregation failed (${resp.status})`);
+    if(!sumResp.ok) throw new Error(`Summary failed (${sumResp.status})`);
+    const [prod, country, cat, pay, month, age] = (await resp.json()).results;
+    const s = await sumResp.json();
+    const byKey=(res, m)=>{ const keys=res.groups[res.dimensions[0]], out={}; keys.forEach((k,i)=> out[k]=res.groups[m][i]); return out; };
+    return {
+      turnover: s.turnover, cost: s.cost, profit: s.profit, customers: s.customers, txn: s.rows,
+      tops: s.rows ? {
+        product: [s.top_product, s.top_product_count], profitProduct: [s.top_profit_product, s.top_profit_product_profit],
+        country: [s.top_country, s.top_country_count], category: s.category_profit[0] || null
+      } : {},
+      productCount: byKey(prod, "count"), productProfit: byKey(prod, "profit"),
+      countryCount: byKey(country, "count"), countrySales: byKey(country, "sales"),
+      categoryProfit: byKey(cat, "profit"), categorySales: byKey(cat, "sales"),
+      payProfit: byKey(pay, "profit"),
+      monthProfit: byKey(month, "profit"), monthSales: byKey(month, "sales"),
+      ageCount: byKey(age, "count")
+    };
+  }
+
+  function renderKPIs(agg){
+    const pct = agg.cost>0 ? agg.profit/agg.cost*100 : 0;
+    document.getElementById("kpi_turnover").textContent=fmtINR(agg.turnover);
+    document.getElementById("kpi_cost").textContent=fmtINR(agg.cost);
+    document.getElementById("kpi_profit").textContent=fmtINR(agg.profit);
+    document.getElementById("kpi_profit_pct").textContent=pct.toFixed(1)+"%";
+    document.getElementById("kpi_customers").textContent=agg.customers;
+    document.getElementById("kpi_txn").textContent=agg.txn;
+  }
+  function chips(id, arr){ const el=document.getElementById(id); el.innerHTML=""; uniqueSorted(arr).forEach(x=>{const s=document.createElement("span"); s.className="chip"; s.textContent=x; el.appendChild(s);}); }
+  function groupKeys(m){ return Object.keys(m).filter(k=> k!=="null" && k!=="undefined"); }
+  function localTops(agg){
+    const top=m=>Object.entries(m).sort((a,b)=>b[1]-a[1])[0];
+    return { product: top(agg.productCount), profitProduct: top(agg.productProfit),
+             country: top(agg.countryCount), category: top(agg.categoryProfit) };
+  }
+  function renderTops(agg){
+    const tops = agg.tops || localTops(agg);
+    const topProd=tops.product;
+    document.getElementById("top_product").textContent = topProd ? `${topProd[0]} (${topProd[1]})` : "—";
+    const topProfitProd=tops.profitProduct;
+    document.getElementById("top_profit_product").textContent = topProfitProd ? `${topProfitProd[0]} (${fmtINR(topProfitProd[1])})` : "—";
+    const topCountry=tops.country;
+    document.getElementById("top_country").textContent = topCountry ? `${topCountry[0]} (${topCountry[1]})` : "—";
+    const topCat=tops.category;
+    document.getElementById("top_category").textContent = topCat ? `${topCat[0]} (${fmtINR(topCat[1])})` : "—";
+    chips("list_categories", groupKeys(agg.categoryProfit));
+    chips("list_products",  groupKeys(agg.productCount));
+    chips("list_ages",      groupKeys(agg.ageCount));
+  }
+
+  // Chart helpers
+  function drawBar(divId, labels, values){
+    Plotly.newPlot(divId,[{x:labels,y:values,type:'bar'}],
+      {paper_bgcolor:'#0f1624',plot_bgcolor:'#0f1624',font:{color:'#e6edf3'},margin:{t:20,r:10,b:60,l:50}}, {displayModeBar:false,responsive:true});
+  }
+  function drawLine(divId, labels, values){
+    Plotly.newPlot(divId,[{x:labels,y:values,type:'scatter',mode:'lines+markers'}],
+      {paper_bgcolor:'#0f1624',plot_bgcolor:'#0f1624',font:{color:'#e6edf3'},margin:{t:20,r:10,b:60,l:50}}, {displayModeBar:false,responsive:true});
+  }
+  function drawPie(divId, labels, values){
+    Plotly.newPlot(divId,[{labels:labels, values:values, type:'pie', hole:0.3}],
+      {paper_bgcolor:'#0f1624',plot_bgcolor:'#0f1624',font:{color:'#e6edf3'},margin:{t:10,b:10}}, {displayModeBar:false,responsive:true});
+  }
+
+  function renderCharts(agg){
+    // Originals
+    drawBar("chart_country_product", Object.keys(agg.countryCount), Object.values(agg.countryCount));
+    drawBar("chart_category_profit", Object.keys(agg.categoryProfit), Object.values(agg.categoryProfit));
+    drawBar("chart_payment_profit",  Object.keys(agg.payProfit), Object.values(agg.payProfit));
+
+    const moOrder=["Jan","Feb","Mar","Apr","May","Jun","Jul","Aug","Sep","Oct","Nov","Dec"];
+    const mProfit=agg.monthProfit;
+    const mpLabels=moOrder.filter(m=>m in mProfit);
+    drawLine("chart_month_profit", mpLabels, mpLabels.map(m=>mProfit[m]||0));
+
+    // New ones
+    const catProfit=agg.categoryProfit;
+    const cLabels=Object.keys(catProfit), cVals=Object.values(catProfit);
+    const cTotal=cVals.reduce((a,b)=>a+b,0)||1;
+    const cPctVals=cVals.map(v=> v/cTotal*100);
+    drawPie("chart_cat_profit_pct", cLabels, cPctVals);
+
+    const countrySales=agg.countrySales;
+    drawPie("chart_country_sales_share", Object.keys(countrySales), Object.values(countrySales));
+
+    const catSales=agg.categorySales;
+    drawBar("chart_category_sales", Object.keys(catSales), Object.values(catSales));
+
+    const mSales=agg.monthSales;
+    const msLabels=moOrder.filter(m=>m in mSales);
+    drawLine("chart_month_sales_trend", msLabels, msLabels.map(m=>mSales[m]||0));
+  }
+
+  // Table (the server sorts, searches and pages; only the visible page is rendered)
+  const TABLE_COLS=["Customer Name","Age","Country","Product","Purchase Date","{{ cost_col }}","Payment Mode","Category","Selling Price","__Profit","__Age Group","__Month"];
+  const TABLE_STATE={ sort:null, descending:false, offset:0, limit:50, q:"", next:null };
+  let TABLE_SEQ=0, SEARCH_TIMER=null;
+  function buildTableHead(){
+    document.querySelector("#data_table thead").innerHTML="<tr>"+TABLE_COLS.map((c,i)=>{
+      const arrow = TABLE_STATE.sort===c ? (TABLE_STATE.descending ? " ▼" : " ▲") : "";
+      return `<th style="cursor:pointer" onclick="sortTable(${i})">${c}${arrow}</th>`;
+    }).join("")+"</tr>";
+  }
+  function buildTableBody(rows){
+    const tbody=document.querySelector("#data_table tbody");
+    const fmt=(k,v)=> (["Selling Price","{{ cost_col }}","__Profit"].includes(k) ? ( "₹"+Math.round(+v||0).toLocaleString("en-IN") ) : v );
+    tbody.innerHTML = rows.map(r=>"<tr>"+TABLE_COLS.map((c,i)=>`<td>${fmt(c, r[i]??"")}</td>`).join("")+"</tr>").join("");
+  }
+  async function loadTablePage(){
+    const seq=++TABLE_SEQ;
+    const resp = await fetch("/table", {
+      method: "POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify({ dataset_id: DATASET_ID, filters: APPLIED_FILTERS, sort: TABLE_STATE.sort, descending: TABLE_STATE.descending,
+                             cursor: String(TABLE_STATE.offset), limit: TABLE_STATE.limit, q: TABLE_STATE.q })
+    });
+    if(seq!==TABLE_SEQ) return;  // a newer request superseded this one
+    if(!resp.ok){ document.getElementById("tbl_info").textContent="Could not load records."; return; }
+    const page = await resp.json();
+    if(seq!==TABLE_SEQ) return;
+    buildTableBody(page.rows);
+    TABLE_STATE.next = page.next_cursor;
+    const from = page.total ? page.offset+1 : 0, to = page.offset+page.rows.length;
+    document.getElementById("tbl_info").textContent=`Showing ${from.toLocaleString("en-IN")}–${to.toLocaleString("en-IN")} of ${page.total.toLocaleString("en-IN")}`;
+    document.getElementById("tbl_prev").disabled = page.offset===0;
+    document.getElementById("tbl_next").disabled = page.next_cursor===null;
+  }
+  function refreshTable(){ TABLE_STATE.offset=0; loadTablePage(); }
+  function sortTable(i){
+    const c=TABLE_COLS[i];
+    if(TABLE_STATE.sort===c) TABLE_STATE.descending=!TABLE_STATE.descending; else { TABLE_STATE.sort=c; TABLE_STATE.descending=false; }
+    buildTableHead(); refreshTable();
+  }
+  function tablePage(step){
+    if(step>0){ if(TABLE_STATE.next===null) return; TABLE_STATE.offset=+TABLE_STATE.next; }
+    else TABLE_STATE.offset=Math.max(0, TABLE_STATE.offset-TABLE_STATE.limit);
+    loadTablePage();
+  }
+  function searchTable(q){ clearTimeout(SEARCH_TIMER); SEARCH_TIMER=setTimeout(()=>{ TABLE_STATE.q=q||""; refreshTable(); }, 200); }
+
+  // CSV + PDF
+  function downloadCSV(){
+    const cols=TABLE_COLS, rows=(CURRENT || rowsMatching(APPLIED_FILTERS)).map(r=> cols.map(c=> r[c]));
+    let csv=cols.join(",")+"\n";
+    rows.forEach(r=>{ csv+=r.map(v=>{const s=(v==null)?"":(""+v); return (s.includes(",")||s.includes('"')||s.includes("\n"))?('"'+s.replace(/"/g,'""')+'"'):s }).join(",")+"\n"; });
+    const blob=new Blob([csv],{type:"text/csv;charset=utf-8;"}); const url=URL.createObjectURL(blob); const a=document.createElement("a");
+    a.href=url; a.download="filtered_data.csv"; a.click(); URL.revokeObjectURL(url);
+  }
+  // ---------- Toast helpers ----------
+function makeToastElement(id, title, message, opts={spinner:false}) {
+  const wrap = document.createElement("div");
+  wrap.className = "cg-toast mb-2";
+  wrap.id = id;
+  const titleEl = document.createElement("div");
+  titleEl.className = "cg-title";
+  titleEl.textContent = title;
+  const bodyEl = document.createElement("div");
+  bodyEl.className = "cg-body";
+  if(opts.spinner) {
+    const sp = document.createElement("span");
+    sp.className = "cg-spinner";
+    bodyEl.appendChild(sp);
+  }
+  const msgSpan = document.createElement("span");
+  msgSpan.className = "cg-msg";
+  msgSpan.textContent = message;
+  bodyEl.appendChild(msgSpan);
+  const row = document.createElement("div");
+  row.style.marginTop = "8px";
+  row.style.display = "flex";
+  row.style.justifyContent = "space-between";
+  row.style.alignItems = "center";
+  const status = document.createElement("small");
+  status.style.color = "#9aa4b2";
+  status.textContent = opts.statusText || "";
+  row.appendChild(status);
+  const closeBtn = document.createElement("button");
+  closeBtn.className = "btn btn-sm";
+  closeBtn.style.fontSize = "0.72rem";
+  closeBtn.style.padding = "4px 8px";
+  closeBtn.style.background = "transparent";
+  closeBtn.style.color = "#9aa4b2";
+  closeBtn.style.border = "1px solid rgba(255,255,255,0.04)";
+  closeBtn.textContent = "Close";
+  closeBtn.onclick = () => wrap.remove();
+  row.appendChild(closeBtn);
+  wrap.appendChild(titleEl);
+  wrap.appendChild(bodyEl);
+  wrap.appendChild(row);
+  return wrap;
+}
+
+function showToast({ title="Info", message="", spinner=false, autoHideMs=6000, statusText="" } = {}) {
+  const container = document.getElementById("cg-toast-container");
+  const id = "cg-toast-" + Math.random().toString(36).slice(2,9);
+  const el = makeToastElement(id, title, message, { spinner: spinner, statusText: statusText });
+  container.appendChild(el);
+  if(autoHideMs > 0) {
+    setTimeout(()=> { if(el && el.remove) el.remove(); }, autoHideMs);
+  }
+  return el;
+}
+
+function updateToast(el, { title, message, spinner=false, statusText="", autoHideMs=5000 } = {}) {
+  if(!el) return;
+  if(title) el.querySelector(".cg-title").textContent = title;
+  if(message) el.querySelector(".cg-msg").textContent = message;
+  const body = el.querySelector(".cg-body");
+  const existingSpinner = body.querySelector(".cg-spinner");
+  if(existingSpinner && !spinner) existingSpinner.remove();
+  if(!existingSpinner && spinner) {
+    const sp = document.createElement("span");
+    sp.className = "cg-spinner";
+    body.insertBefore(sp, body.firstChild);
+  }
+  const small = el.querySelector("small");
+  if(small) small.textContent = statusText;
+  if(autoHideMs > 0) setTimeout(()=>{ try{ el.remove(); }catch(e){} }, autoHideMs);
+}
+
+// ---------- Improved downloadPDF ----------
+const REPORT_STAGE_TEXT = {
+  queued: "Waiting in queue…",
+  aggregate: "Crunching the numbers…",
+  charts: "Rendering charts…",
+  layout: "Laying out pages…"
+};
+const sleep = ms => new Promise(r => setTimeout(r, ms));
+
+async function downloadPDF(){
+  const btn = document.getElementById("btn_pdf");
+  try {
+    const toastEl = showToast({ title: "Generating report…", message: "Preparing your PDF. This may take a few seconds.", spinner: true, autoHideMs: 0, statusText: "Working" });
+    if(btn) { btn.disabled = true; btn.classList.add("disabled"); }
+
+    const payload = { dataset_id: DATASET_ID, filters: APPLIED_FILTERS };
+    const split = (document.getElementById("pdf_split") || {}).value;
+    if(split) payload.split_by = split;
+    const resp = await fetch("/reports", {
+      method: "POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify(payload)
+    });
+    let job = await resp.json().catch(()=>({}));
+
+    if(!resp.ok){
+      updateToast(toastEl, { title: "Failed", message: job.error || `Server error (${resp.status}).`, spinner: false, statusText: "Error", autoHideMs: 6000 });
+      return;
+    }
+
+    // The report is built in the background; poll until it is ready
+    const statusUrl = job.status_url, downloadUrl = job.download_url;
+    while(job.state === "queued" || job.state === "running"){
+      const pct = Math.round((job.progress || 0) * 100);
+      updateToast(toastEl, { message: REPORT_STAGE_TEXT[job.stage || "queued"] || "Working…", spinner: true, statusText: `${pct}%`, autoHideMs: 0 });
+      await sleep(1000);
+      const r = await fetch(statusUrl);
+      job = await r.json().catch(()=>({}));
+      if(!r.ok){ job = { state: "failed", error: job.error || `Server error (${r.status}).` }; }
+    }
+
+    if(job.state !== "done"){
+      updateToast(toastEl, { title: "Failed", message: job.error || "Could not generate PDF.", spinner: false, statusText: "Error", autoHideMs: 6000 });
+      return;
+    }
+
+    const a = document.createElement("a");
+    a.href = downloadUrl;
+    a.download = job.filename || "Sales_Report.pdf";
+    document.body.appendChild(a);
+    a.click();
+    a.remove();
+
+    updateToast(toastEl, { title: "Done", message: "Report generated — download started.", spinner: false, statusText: "Completed", autoHideMs: 4000 });
+  } catch(err) {
+    console.error("PDF generation error:", err);
+    showToast({ title: "Error", message: "Could not generate PDF. See console for details.", spinner: false, autoHideMs: 7000, statusText: "Failed" });
+  } finally {
+    if(btn) { btn.disabled = false; btn.classList.remove("disabled"); }
+  }
+}
+
+
+  // ===== Time series (server-side rollups at the chosen granularity) =====
+  let TS_SEQ=0;
+  async function runTimeseries(){
+    const seq=++TS_SEQ;
+    const granularity = document.getElementById("ts_granularity").value || "month";
+    const resp = await fetch("/timeseries", {
+      method: "POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify({ dataset_id: DATASET_ID, filters: APPLIED_FILTERS, granularity: granularity,
+                             measures: ["sales","cost","profit"] })
+    });
+    if(!resp.ok || seq!==TS_SEQ) return;  // a newer request has been sent
+    const data = await resp.json();
+    const s = data.series[0] || {sales:[], cost:[], profit:[]};
+    const line = (y, name)=>({ x:data.periods, y:y, type:'scatter', mode: data.periods.length > 60 ? 'lines' : 'lines+markers', name:name });
+    Plotly.newPlot("chart_timeseries", [line(s.sales, 'Sales'), line(s.cost, 'Cost'), line(s.profit, 'Profit')],
+      { paper_bgcolor:'#0f1624', plot_bgcolor:'#0f1624', font:{color:'#e6edf3'}, margin:{t:20,r:10,b:60,l:50} },
+      { displayModeBar:false, responsive:true });
+  }
+
+  // ===== Forecast (server-side) =====
+  async function runForecast(){
+    const horizon = parseInt(document.getElementById("fc_horizon").value || "3");
+    const resp = await fetch("/forecast", {
+      method: "POST",
+      headers: {"Content-Type":"application/json"},
+      body: JSON.stringify({ dataset_id: DATASET_ID, filters: APPLIED_FILTERS, horizon: horizon })
+    });
+    if(!resp.ok){
+      document.getElementById("pred_note").textContent = "Forecast failed.";
+      return;
+    }
+    const data = await resp.json();
+
+    // Update mini card
+    document.getElementById("pred_next_month").textContent = fmtINR(data.next_month || 0);
+    document.getElementById("pred_note").textContent = data.note || "";
+
+    // Draw chart
+    const hist = data.history;   // [{period:'2025-01', sales:123}, ...]
+    const fc   = data.forecast;  // same format
+    const hx = hist.map(d=>d.period), hy = hist.map(d=>d.sales);
+    const fx = fc.map(d=>d.period), fy = fc.map(d=>d.sales);
+
+    // Prediction interval bands, widest first: an invisible upper edge, then the lower edge filled up to it
+    const bands = [];
+    Object.keys(data.intervals || {}).sort((a,b)=>b-a).forEach(level => {
+      const band = data.intervals[level];
+      const fill = level >= 90 ? 'rgba(99,160,255,0.15)' : 'rgba(99,160,255,0.3)';
+      bands.push(
+        { x:fx, y:band.upper, type:'scatter', mode:'lines', line:{width:0}, hoverinfo:'skip', showlegend:false },
+        { x:fx, y:band.lower, type:'scatter', mode:'lines', line:{width:0}, fill:'tonexty', fillcolor:fill,
+          name:level + '% interval', hovertemplate:'%{x}<br>' + level + '% lower: %{y:,.0f}<extra></extra>' }
+      );
+    });
+
+    Plotly.newPlot("chart_forecast",
+      [
+        { x:hx, y:hy, type:'scatter', mode:'lines+markers', name:'History' },
+        ...bands,
+        { x:fx, y:fy, type:'scatter', mode:'lines+markers', name:'Forecast', line:{dash:'dash'} }
+      ],
+      { title:"Sales (Monthly) — History & Forecast",
+        paper_bgcolor:'#0f1624', plot_bgcolor:'#0f1624', font:{color:'#e6edf3'},
+        margin:{t:40,r:10,b:60,l:50}
+      },
+      { displayModeBar:false, responsive:true }
+    );
+  }
+
+  // Init
+  async function refreshAll(){
+    try {
+      const agg = RAW.length > AGG_SERVER_THRESHOLD ? await serverAggregates() : localAggregates();
+      renderKPIs(agg); renderTops(agg); renderCharts(agg);
+      await runTimeseries();
+    } catch(err) {
+      console.error(err);
+      showToast({ title: "Error", message: "Could not refresh KPIs and charts.", autoHideMs: 6000, statusText: "Failed" });
+    }
+    refreshTable();
+  }
+  loadData().then(()=>{
+    initFilters(); buildTableHead(); refreshAll();
+
+    // (Optional) auto-run forecast once on load
+    runForecast();
+  }).catch(err=>{
+    console.error(err);
+    showToast({ title: "Error", message: "Could not load the uploaded data. Please upload the file again.", autoHideMs: 0, statusText: "Failed" });
+  });
+{% endif %}
+</script>
+</body>
+</html>
+"""
@@ -0,0 +1,91 @@
+# vector_charts.py
+# Report charts drawn directly as reportlab vector graphics from the aggregated
+# series. No headless browser is involved and the PDF stores a few hundred path
+# operators per chart instead of a 2000x1000 PNG.
+
+from reportlab.graphics.charts.barcharts import VerticalBarChart
+from reportlab.graphics.charts.linecharts import HorizontalLineChart
+from reportlab.graphics.charts.piecharts import Pie
+from reportlab.graphics.shapes import Drawing, String
+from reportlab.graphics.widgets.markers import makeMarker
+from reportlab.lib import colors
+
+# plotly.express.colors.qualitative.Pastel, so both renderers colour pies alike
+PASTEL = ["#66C5CC", "#F6CF71", "#F89C74", "#DCB0F2", "#87C55F", "#9EB9F3",
+          "#FE88B1", "#C9DB74", "#8BE0A4", "#B497E7", "#B3B3B3"]
+GRID = colors.HexColor("#E5ECF6")
+TEXT = colors.HexColor("#2A3F5F")
+
+
+def _si(value):
+    """Compact axis label: 1.2M, 350k, 900."""
+    for div, suffix in ((1e9, "B"), (1e6, "M"), (1e3, "k")):
+        if abs(value) >= div:
+            return f"{value / div:.3g}{suffix}"
+    return f"{value:.3g}"
+
+
+def _axes(chart, labels, values, width, height):
+    chart.x, chart.y = 50, 40
+    chart.width, chart.height = width - 80, height - 90
+    chart.categoryAxis.categoryNames = [str(v) for v in labels]
+    chart.categoryAxis.labels.fontSize = 7
+    chart.categoryAxis.labels.fillColor = TEXT
+    chart.categoryAxis.strokeColor = GRID
+    if len(labels) > 8:
+        chart.categoryAxis.labels.angle = 30
+        chart.categoryAxis.labels.boxAnchor = "ne"
+    low = min(0.0, min(values))
+    chart.valueAxis.valueMin = low
+    chart.valueAxis.valueMax = max(values) * 1.05 if max(values) > 0 else 1.0
+    chart.valueAxis.labelTextFormat = _si
+    chart.valueAxis.labels.fontSize = 7
+    chart.valueAxis.labels.fillColor = TEXT
+    chart.valueAxis.visibleGrid = True
+    chart.valueAxis.gridStrokeColor = GRID
+    chart.valueAxis.strokeColor = GRID
+
+
+def draw_chart(kind, labels, values, title, color, width, height):
+    """A bar, line or pie chart of `values` by `labels` as a `width` x `height` Drawing."""
+    values = [float(v) for v in values]
+    d = Drawing(width, height)
+    d.add(String(width / 2, height - 20, title, fontName="Helvetica", fontSize=12,
+                 fillColor=TEXT, textAnchor="middle"))
+
+    if kind == "bar":
+        chart = VerticalBarChart()
+        chart.data = [values]
+        _axes(chart, labels, values, width, height)
+        chart.bars[0].fillColor = colors.HexColor(color)
+        chart.bars[0].strokeColor = None
+        chart.barSpacing = 2
+        chart.groupSpacing = 8
+    elif kind == "line":
+        chart = HorizontalLineChart()
+        chart.data = [values]
+        _axes(chart, labels, values, width, height)
+        chart.joinedLines = 1
+        chart.lines[0].strokeColor = colors.HexColor(color)
+        chart.lines[0].strokeWidth = 2
+        chart.lines[0].symbol = makeMarker("FilledCircle", size=5, fillColor=colors.HexColor(color))
+    elif kind == "pie":
+        total = sum(values) or 1.0
+        chart = Pie()
+        size = min(width, height) - 80
+        chart.x, chart.y = (width - size) / 2, (height - 40 - size) / 2
+        chart.width = chart.height = size
+        chart.data = values
+        chart.labels = [f"{label} {v / total:.1%}" for label, v in zip(labels, values)]
+        chart.sideLabels = True
+        chart.simpleLabels = False
+        chart.slices.strokeColor = colors.white
+        chart.slices.strokeWidth = 0.5
+        chart.slices.fontSize = 7
+        chart.slices.fontColor = TEXT
+        for i in range(len(values)):
+            chart.slices[i].fillColor = colors.HexColor(PASTEL[i % len(PASTEL)])
+    else:
+        raise ValueError(f"Unknown chart kind '{kind}'.")
+    d.add(chart)
+    return d
@@ -0,0 +1,484 @@
+# web.py
+# Flask routes for the sales dashboard. Report generation (plotly, kaleido,
+# reportlab) lives in .report and is imported on first use; set
+# PRELOAD_REPORT_LIBS=1 to import it up front, e.g. in a pre-fork master.
+
+from flask import Flask, request, render_template_string, send_file, jsonify, redirect, url_for, session, flash
+import pandas as pd
+import io, os, csv, gzip, hashlib
+from datetime import datetime
+
+from . import preload_report_libs
+from .ingest import load_upload
+from .datasets import FILTER_COLUMNS, registry
+from .payload import columnar_payload
+from .cache import dataset_heads, parse_cache, report_cache, report_key, upload_digest
+from .aggregate import AGG_SERVER_THRESHOLD, aggregate
+from .cube import build_cube
+from .bitmap_index import build_bitmap_index
+from .table import TABLE_PAGE_SIZE, table_page
+from .search_index import build_search_index
+from .summary import summarize
+from .timeseries import GRANULARITIES, ROLLUP_MEASURES, build_rollups, period_labels
+from .forecast import PREDICTION_LEVELS, forecast_segments
+from .backtest import BACKTEST_WORKERS, backtest_dataset
+from .charts import CHART_RENDERERS, DEFAULT_CHART_RENDERER, chart_cache
+from .jobs import (DEFAULT_REPORT_APPENDIX, REPORT_APPENDIX_MODES, REPORT_STAGES, QueueFull, render_burst,
+                   render_report, report_jobs)
+from .templates import LOGIN_HTML, HTML
+
+app = Flask(__name__)
+app.secret_key = "replace-with-a-strong-secret-key"  # required for sessions
+registry.secret = app.secret_key  # signs dataset ids to their uploader
+
+USERS_CSV = "users.csv"
+
+# -------------------- Helpers --------------------
+def ensure_users_csv():
+    """Create a default users.csv if missing."""
+    if not os.path.exists(USERS_CSV):
+        with open(USERS_CSV, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["email", "password"])
+            writer.writerow(["admin@example.com", "1234"])
+
+def check_credentials(email: str, password: str) -> bool:
+    if not os.path.exists(USERS_CSV):
+        ensure_users_csv()
+    try:
+        df = pd.read_csv(USERS_CSV, dtype=str).fillna("")
+    except Exception:
+        return False
+    row = df[(df["email"] == email) & (df["password"] == password)]
+    return not row.empty
+
+# -------------------- Auth Routes --------------------
+@app.route("/login", methods=["GET", "POST"])
+def login():
+    ensure_users_csv()
+    if request.method == "GET":
+        return render_template_string(LOGIN_HTML)
+    # POST
+    email = (request.form.get("email") or "").strip()
+    password = (request.form.get("password") or "").strip()
+    if check_credentials(email, password):
+        session["user"] = email
+        return redirect(url_for("home"))
+    flash("Invalid email or password.")
+    return render_template_string(LOGIN_HTML)
+
+@app.route("/logout")
+def logout():
+    session.pop("user", None)
+    return redirect(url_for("login"))
+
+# -------------------- Template Download --------------------
+@app.route("/download_template")
+def download_template():
+    # Generate Excel template in-memory
+    cols = [
+        "Customer Name","Age","Country","Product","Purchase Date",
+        "Purchase Amount","Payment Mode","Category","Selling Price"
+    ]
+    example_row = {
+        "Customer Name": "Rahul Sharma",
+        "Age": 28,
+        "Country": "India",
+        "Product": "Smartphone",
+        "Purchase Date": datetime.now().strftime("%Y-%m-%d"),
+        "Purchase Amount": 18000,
+        "Payment Mode": "UPI",
+        "Category": "Electronics",
+        "Selling Price": 22000
+    }
+    df = pd.DataFrame([example_row], columns=cols)
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        df.to_excel(writer, index=False, sheet_name="Template")
+    buf.seek(0)
+    return send_file(buf, as_attachment=True, download_name="sales_template.xlsx", mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")
+
+# -------------------- Dashboard Routes --------------------
+@app.route("/", methods=["GET"])
+def home():
+    if "user" not in session:
+        return redirect(url_for("login"))
+    return render_template_string(HTML, has_data=False)
+
+@app.route("/dashboard", methods=["POST"])
+def dashboard():
+    if "user" not in session:
+        return redirect(url_for("login"))
+    file = request.files.get("excel_file")
+    if not file:
+        return render_template_string(HTML, has_data=False)
+
+    # Identical bytes always prepare to the same frame, so re-uploads skip parsing
+    digest = upload_digest(file)
+    cached = parse_cache.load(digest)
+    if cached is not None:
+        df_view, cost_col = cached
+    else:
+        df_view, cost_col = load_upload(file)
+        parse_cache.store(digest, df_view, cost_col)
+    ds = registry.add(df_view, cost_col, owner=session["user"], content_hash=digest)
+    ds.derived("cube", build_cube)
+    ds.derived("bitmaps", build_bitmap_index)
+    ds.derived("timeseries", build_rollups)
+    # The search index is only needed once someone types in the table search box
+    ds.derived_async("search", build_search_index)
+
+    return render_template_string(
+        HTML,
+        has_data=True,
+        cost_col=cost_col,
+        dataset_id=ds.id,
+        agg_threshold=AGG_SERVER_THRESHOLD
+    )
+
+def _dataset_from_payload(payload):
+    return registry.get(payload.get("dataset_id"), owner=session.get("user"))
+
+# -------------------- Aggregation API --------------------
+@app.route("/aggregate", methods=["POST"])
+def aggregate_api():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+
+    # Either a batch of {"dimensions", "measures"} queries or a single query inline
+    batched = isinstance(payload.get("queries"), list)
+    queries = payload["queries"] if batched else [payload]
+    try:
+        results = aggregate(ds, payload.get("filters"), queries)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify({"results": results} if batched else results[0]), 200
+
+@app.route("/summary", methods=["POST"])
+def summary_api():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    return jsonify(summarize(ds, payload.get("filters")).to_dict()), 200
+
+@app.route("/timeseries", methods=["POST"])
+def timeseries_api():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    granularity = payload.get("granularity") or "month"
+    if granularity not in GRANULARITIES:
+        return jsonify({"error": f"Unknown granularity '{granularity}'. Choose one of: {', '.join(GRANULARITIES)}."}), 400
+    by = payload.get("by") or None
+    if by is not None and by not in FILTER_COLUMNS:
+        return jsonify({"error": f"Cannot split by '{by}'. Choose one of: {', '.join(FILTER_COLUMNS)}."}), 400
+    measures = payload.get("measures") or list(ROLLUP_MEASURES)
+    if not isinstance(measures, list) or any(m not in ROLLUP_MEASURES for m in measures):
+        return jsonify({"error": f"measures must be a list of: {', '.join(ROLLUP_MEASURES)}."}), 400
+
+    periods, segments, values = ds.derived("timeseries", build_rollups).series(
+        payload.get("filters"), granularity, by, measures)
+    return jsonify({
+        "granularity": granularity,
+        "by": by,
+        "periods": period_labels(periods, granularity),
+        "series": [{"segment": segment, **{m: values[m][i].astype(int if m == "count" else float).tolist()
+                                           for m in measures}}
+                   for i, segment in enumerate(segments)],
+    }), 200
+
+@app.route("/facets", methods=["POST"])
+def facets_api():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    return jsonify(ds.derived("bitmaps", build_bitmap_index).facets(payload.get("filters"))), 200
+
+# -------------------- Data Table API --------------------
+@app.route("/table", methods=["POST"])
+def table_api():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    try:
+        page = table_page(
+            ds,
+            filters=payload.get("filters"),
+            sort=payload.get("sort"),
+            descending=bool(payload.get("descending")),
+            cursor=payload.get("cursor"),
+            limit=payload.get("limit", TABLE_PAGE_SIZE),
+            query=payload.get("q"),
+            search_mode=payload.get("search_mode", "contains"),
+        )
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(page), 200
+
+@app.route("/cache_stats", methods=["GET"])
+def cache_stats():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    return jsonify({"parse": parse_cache.stats(), "charts": chart_cache.stats(),
+                    "report_cache": report_cache.stats(), "reports": report_jobs.stats(),
+                    "datasets": registry.stats()}), 200
+
+# -------------------- Dataset Payload --------------------
+def _data_etag(ds):
+    # Content hashes change with every append and repeat only for the same rows;
+    # version numbers restart at 0 when the file is uploaded again
+    return f'"{ds.content_hash or f"{ds.id}-{ds.version}"}"'
+
+
+def _columnar(ds):
+    # Built together, so the ETag always describes the rows in the body
+    return _data_etag(ds), columnar_payload(ds.frame)
+
+
+def _columnar_gz(ds):
+    etag, body = ds.derived("columnar", _columnar)
+    return etag, gzip.compress(body, 6)
+
+
+@app.route("/data/<dataset_id>", methods=["GET"])
+def dataset_data(dataset_id):
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    ds = registry.get(dataset_id, owner=session["user"])
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+
+    etag = _data_etag(ds)
+    if request.headers.get("If-None-Match") == etag:
+        return "", 304, {"ETag": etag}
+
+    # no-cache: the browser may keep the payload but must revalidate the ETag, since appends change it
+    gzipped = "gzip" in request.headers.get("Accept-Encoding", "")
+    etag, body = ds.derived("columnar.gz", _columnar_gz) if gzipped else ds.derived("columnar", _columnar)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache", "Vary": "Accept-Encoding"}
+    if gzipped:
+        headers["Content-Encoding"] = "gzip"
+    return app.response_class(body, mimetype="application/json", headers=headers)
+
+@app.route("/data/<dataset_id>/append", methods=["POST"])
+def dataset_append(dataset_id):
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    ds = registry.get(dataset_id, owner=session["user"])
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    file = request.files.get("excel_file")
+    if not file:
+        return jsonify({"error": "No file uploaded."}), 400
+
+    digest = upload_digest(file)
+    try:
+        rows, cost_col = load_upload(file)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    rows = rows.rename(columns={cost_col: ds.cost_col})
+    # Same content plus the same appended bytes gives the same report cache keys
+    content_hash = hashlib.sha256(f"{ds.content_hash}+{digest}".encode()).hexdigest() if ds.content_hash else None
+    ds.append(rows, content_hash=content_hash)
+    if content_hash:
+        # Other workers reload the appended dataset from the parse cache
+        frame, content_hash, version = ds.read(lambda frame, dates: (frame, ds.content_hash, ds.version))
+        parse_cache.store(content_hash, frame, ds.cost_col)
+        dataset_heads.store(ds.id, content_hash, version)
+    ds.derived("cube", build_cube)
+    ds.derived("bitmaps", build_bitmap_index)
+    ds.derived("timeseries", build_rollups)
+    ds.derived_async("search", build_search_index)
+    return jsonify({"dataset_id": ds.id, "version": ds.version, "appended": len(rows), "rows": len(ds)}), 200
+
+# -------------------- Forecast API --------------------
+@app.route("/forecast", methods=["POST"])
+def forecast():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    try:
+        horizon = int(payload.get("horizon", 3))
+    except (TypeError, ValueError):
+        return jsonify({"error": "horizon must be an integer."}), 400
+
+    try:
+        result = forecast_segments(ds, payload.get("filters"), None, horizon, payload.get("method") or "trend",
+                                   payload.get("levels", PREDICTION_LEVELS))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if not result["periods"]:
+        return jsonify({"history": [], "forecast": [], "intervals": None, "next_month": 0, "note": "No data to forecast."}), 200
+    series = result["series"][0]
+    return jsonify({
+        "history": [{"period": p, "sales": v} for p, v in zip(result["periods"], series["history"])],
+        "forecast": [{"period": p, "sales": v} for p, v in zip(result["forecast_periods"], series["forecast"])],
+        "intervals": series["intervals"],
+        "next_month": series["next_month"],
+        "note": series["note"]
+    }), 200
+
+@app.route("/forecast/batch", methods=["POST"])
+def forecast_batch():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    by = payload.get("by")
+    if by not in FILTER_COLUMNS:
+        return jsonify({"error": f"Cannot forecast by '{by}'. Choose one of: {', '.join(FILTER_COLUMNS)}."}), 400
+    try:
+        horizon = int(payload.get("horizon", 3))
+    except (TypeError, ValueError):
+        return jsonify({"error": "horizon must be an integer."}), 400
+    try:
+        result = forecast_segments(ds, payload.get("filters"), by, horizon, payload.get("method") or "trend",
+                                   payload.get("levels", PREDICTION_LEVELS))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    return jsonify(result), 200
+
+@app.route("/forecast/backtest", methods=["POST"])
+def forecast_backtest():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    by = payload.get("by") or None
+    if by is not None and by not in FILTER_COLUMNS:
+        return jsonify({"error": f"Cannot backtest by '{by}'. Choose one of: {', '.join(FILTER_COLUMNS)}."}), 400
+    try:
+        horizon = int(payload.get("horizon", 3))
+        min_train = int(payload.get("min_train", 6))
+    except (TypeError, ValueError):
+        return jsonify({"error": "horizon and min_train must be integers."}), 400
+    report = backtest_dataset(ds, payload.get("filters"), by, horizon, min_train, workers=BACKTEST_WORKERS)
+    return jsonify(report), 200
+
+# -------------------- PDF (No Matplotlib) --------------------
+def _report_options(payload):
+    renderer = payload.get("renderer") or DEFAULT_CHART_RENDERER
+    appendix = payload.get("appendix") or DEFAULT_REPORT_APPENDIX
+    if renderer not in CHART_RENDERERS:
+        raise ValueError(f"Unknown chart renderer '{renderer}'.")
+    if appendix not in REPORT_APPENDIX_MODES:
+        raise ValueError(f"Unknown appendix mode '{appendix}'.")
+    return {"renderer": renderer, "appendix": appendix}
+
+
+@app.route("/download_pdf", methods=["POST"])
+def download_pdf():
+    if "user" not in session:
+        return ("Unauthorized", 401)
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return ("Dataset not found. Please upload the file again.", 404)
+    filters = payload.get("filters")
+    try:
+        options = _report_options(payload)
+        key = report_key(ds, filters, **options)
+        if key and request.if_none_match.contains(key):
+            return ("", 304, {"ETag": f'"{key}"'})
+        pdf = render_report(ds, filters, key, options)
+    except ValueError as e:
+        return (str(e), 400)
+    resp = send_file(io.BytesIO(pdf), mimetype="application/pdf", as_attachment=True, download_name="Sales_Report.pdf")
+    if key:
+        resp.set_etag(key)
+    return resp
+
+
+# -------------------- Report Jobs --------------------
+@app.route("/reports", methods=["POST"])
+def submit_report():
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+
+    payload = request.get_json(silent=True) or {}
+    ds = _dataset_from_payload(payload)
+    if ds is None:
+        return jsonify({"error": "Dataset not found. Please upload the file again."}), 404
+    filters = payload.get("filters")
+    split_by = payload.get("split_by") or None
+    try:
+        options = _report_options(payload)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if split_by is None:
+        key = report_key(ds, filters, **options)
+        fn = lambda progress: render_report(ds, filters, key, options, progress)
+        filename = "Sales_Report.pdf"
+    elif split_by in FILTER_COLUMNS:
+        # Burst: one PDF per value of the split column, returned as a single ZIP
+        key = report_key(ds, filters, split_by=split_by, **options)
+        fn = lambda progress: render_burst(ds, filters, split_by, key, options, progress)
+        filename = f"Sales_Reports_by_{split_by.strip('_').replace(' ', '_')}.zip"
+    else:
+        return jsonify({"error": f"Cannot split reports by '{split_by}'."}), 400
+    try:
+        job = report_jobs.submit(fn, owner=session["user"], stages=REPORT_STAGES, filename=filename, etag=key)
+    except QueueFull as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": "10"}
+    return jsonify({**job.status(), "status_url": url_for("report_status", job_id=job.id),
+                    "download_url": url_for("report_download", job_id=job.id)}), 202
+
+
+@app.route("/reports/<job_id>", methods=["GET"])
+def report_status(job_id):
+    if "user" not in session:
+        return jsonify({"error": "unauthorized"}), 401
+    job = report_jobs.get(job_id, owner=session["user"])
+    if job is None:
+        return jsonify({"error": "Report not found or expired."}), 404
+    return jsonify(job.status()), 200
+
+
+@app.route("/reports/<job_id>/download", methods=["GET"])
+def report_download(job_id):
+    if "user" not in session:
+        return ("Unauthorized", 401)
+    job = report_jobs.get(job_id, owner=session["user"])
+    if job is None:
+        return ("Report not found or expired.", 404)
+    if job.state != "done":
+        return (job.error or "Report is not ready yet.", 409)
+    # Conditional GET: a matching If-None-Match gets 304 without the body.
+    # The content type (PDF, or ZIP for burst reports) follows the file name.
+    return send_file(job.path, as_attachment=True, download_name=job.filename, etag=job.etag or True)
+
+
+if os.environ.get("PRELOAD_REPORT_LIBS") == "1":
+    preload_report_libs()
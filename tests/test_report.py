@@ -0,0 +1,35 @@
+# tests/test_report.py
+
+import pandas as pd
+
+from sales_dashboard import charts, report
+from sales_dashboard.datasets import Dataset
+from sales_dashboard.ingest import prepare_dataframe
+
+
+def _dataset(categories):
+    n = len(categories)
+    raw = pd.DataFrame({
+        "Customer Name": [f"Customer {i}" for i in range(n)],
+        "Age": [30] * n,
+        "Country": ["India"] * n,
+        "Product": ["Lamp"] * n,
+        "Purchase Date": ["2024-03-05"] * n,
+        "Purchase Amount": [100.0] * n,
+        "Payment Mode": ["UPI"] * n,
+        "Category": categories,
+        "Selling Price": [150.0] * n,
+    })
+    return Dataset(*prepare_dataframe(raw))
+
+
+def test_burst_by_numeric_column_filters_each_segment(monkeypatch):
+    monkeypatch.setattr(charts, "CHART_WORKERS", 1)  # lay out in this process
+    laid_out = []
+    monkeypatch.setattr(report, "_layout_report", lambda summary, *args: laid_out.append(summary) or b"%PDF")
+
+    reports = report.burst_reports(_dataset([1, 2, 2, 3, 3, 3]), "Category", renderer="vector")
+
+    assert [segment for segment, _ in reports] == [1, 2, 3]
+    assert all(type(segment) is int for segment, _ in reports)
+    assert [summary.rows for summary in laid_out] == [1, 2, 3]